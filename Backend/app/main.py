@@ -1,14 +1,32 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.routes.provedor_producto import router as provedor_producto_router
 from app.routes.auth import router as auth_router
 from app.routes.users import router as users_router
+from app.routes.dashboard import router as dashboard_router
+from app.routes.stats import router as stats_router
 from sqlalchemy import text
-from fastapi.staticfiles import StaticFiles
 from pathlib import Path
-from app.database import SessionLocal
+from app.database import SessionLocal, async_engine, async_replica_engine, engine, replica_engine
+from app.utils import contadores, hashing, imagenes, metricas
+from app.utils.estaticos import ImagenesStaticFiles
+from app.utils.perfil_sql import PerfilSQLMiddleware, instrumentar
+from app.utils.respuestas import RespuestaJSON
+from app.utils.versiones import LISTADOS, VersionesETagMiddleware
+import asyncio
 
-app = FastAPI()
+# orjson y gzip/brotli por encima de COMPRESION_MINIMA_BYTES en todas las respuestas JSON
+app = FastAPI(default_response_class=RespuestaJSON)
+
+# Consultas y tiempo de base de datos por petición en la cabecera Server-Timing
+instrumentar(engine, replica_engine, async_engine.sync_engine, async_replica_engine.sync_engine)
+app.add_middleware(PerfilSQLMiddleware)
+
+# GET condicional de los listados: 304 sin llegar a la ruta si no hubo escrituras.
+# Se registra antes que CORS para que las respuestas 304 también lleven sus cabeceras
+app.add_middleware(VersionesETagMiddleware)
 
 # CORS
 app.add_middleware(
@@ -18,26 +36,53 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+
+# Se registra al final para quedar por fuera y medir la petición completa
+app.add_middleware(metricas.MetricasMiddleware, rutas_estaticas=LISTADOS)
+metricas.registrar_engines(
+    principal=engine, replica=replica_engine,
+    principal_async=async_engine.sync_engine, replica_async=async_replica_engine.sync_engine,
+)
 BASE_DIR = Path(__file__).resolve().parent.parent
 IMAGES_DIR = BASE_DIR / "images"
 IMAGES_DIR.mkdir(exist_ok=True)
 
-app.mount("/images", StaticFiles(directory=IMAGES_DIR), name="images")
+app.mount("/images", ImagenesStaticFiles(directory=IMAGES_DIR), name="images")
 
 app.include_router(provedor_producto_router)
 app.include_router(auth_router)
 app.include_router(users_router)
+app.include_router(dashboard_router)
+app.include_router(stats_router)
+
+@app.on_event("startup")
+async def iniciar_tareas():
+    asyncio.create_task(contadores.reconciliar_periodicamente())
+    # Variantes de las imágenes subidas antes de que existieran, sin bloquear el arranque
+    asyncio.create_task(run_in_threadpool(imagenes.generar_variantes_faltantes))
+
+@app.on_event("shutdown")
+def detener_tareas():
+    hashing.cerrar()
 
 @app.get("/")
 def root():
     return {"message": "Hello, World!"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Métricas en formato de texto de Prometheus"""
+    return PlainTextResponse(metricas.exponer(), media_type="text/plain; version=0.0.4")
+
 @app.get("/db-status")
 def db_status():
     try:
         db = SessionLocal()
         db.execute(text("SELECT 1"))
         db.close()
+        if replica_engine is not engine:
+            with replica_engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
         return {"status": "ok", "message": "Conexión exitosa a la base de datos"}
     except Exception as e:
         return {"status": "error", "message": str(e)}
@@ -6,12 +6,12 @@ class Cliente(Base):
     __tablename__ = "clientes"
 
     id = Column(Integer, primary_key=True, index=True)
-    nombre = Column(String(100), nullable=False)
+    nombre = Column(String(100), nullable=False, index=True)
     correo = Column(String(100), nullable=True)
     telefono = Column(String(20), nullable=True)
     direccion = Column(String(100), nullable=True)
     is_active = Column(Boolean, default=True, nullable=True)
-    documento = Column(String(100), nullable=True)
+    documento = Column(String(100), nullable=True, index=True)
     tipoDocumento = Column(String(50), nullable= False, default="DNI")
 
     ventas = relationship("Venta", back_populates="cliente")
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, func, DECIMAL, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Computed, func, DECIMAL, String, Index
 from sqlalchemy.orm import relationship
 from ..database import Base
 
@@ -6,9 +6,13 @@ class Compra(Base):
     __tablename__ = "compras"
     id = Column(Integer, primary_key=True, index=True)
     proveedor_id = Column(Integer, ForeignKey("proveedores.id"), nullable=False)
-    fecha = Column(DateTime, default=func.now())    
+    fecha = Column(DateTime, default=func.now(), nullable=False)    
     orden_compra = Column(String(20), unique=True, nullable=False)
 
+    # Paginación por keyset y filtros por rango de fechas
+    __table_args__ = (Index("ix_compras_fecha_id", "fecha", "id"),)
+
+    proveedor = relationship("Proveedor")
     detalles = relationship("DetalleCompra", back_populates="compra", cascade="all, delete-orphan")
 
 
@@ -19,5 +23,7 @@ class DetalleCompra(Base):
     producto_id = Column(Integer, ForeignKey("productos.id"), nullable=False)
     cantidad = Column(Integer, nullable=False)
     precio_unitario = Column(DECIMAL(10, 2), nullable=False)
+    total = Column(DECIMAL(10, 2), Computed("cantidad * precio_unitario", persisted=True))
 
     compra = relationship("Compra", back_populates="detalles")
+    producto = relationship("Producto")
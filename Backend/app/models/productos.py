@@ -8,14 +8,14 @@ class Producto(Base):
     __tablename__ = "productos"
 
     id = Column(Integer, primary_key=True, index=True)
-    nombre = Column(String(100), nullable=False)
+    nombre = Column(String(100), nullable=False, index=True)
     descripcion = Column(Text, nullable=True)
     precio_compra = Column(DECIMAL(10, 2), nullable=True)
     precio_venta = Column(DECIMAL(10, 2), nullable=True)
     stock = Column(Integer, nullable=True)
     tUnidad = Column(Integer, ForeignKey("tUnidad.id")) 
     fechaIngreso = Column(TIMESTAMP, nullable=True, server_default=func.now())
-    is_active = Column(Boolean, default=True, nullable=True)
+    is_active = Column(Boolean, default=True, nullable=True, index=True)
     imagen = Column(String(255), nullable=True)
 
     tipo_unidad = relationship("TipoUnidad")  
@@ -12,12 +12,12 @@ class Proveedor(Base):
     __tablename__ = "proveedores"
 
     id = Column(Integer, primary_key=True, index=True)
-    nombre = Column(String(100), nullable=False)
+    nombre = Column(String(100), nullable=False, index=True)
     correo = Column(String(100), nullable=True)
     telefono = Column(String(20), nullable=True)
     direccion = Column(String(100), nullable=True)
     is_active = Column(Boolean, default=True, nullable=True)
-    documento = Column(String(100), nullable=True)
+    documento = Column(String(100), nullable=True, index=True)
     tipoDocumento = Column(String(50), nullable= False, default="RUC")
 
     productos = relationship("Producto", secondary="proveedor_producto", back_populates="proveedores")
\ No newline at end of file
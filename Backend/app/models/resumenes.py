@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, BigInteger, Date, DECIMAL, ForeignKey
+from ..database import Base
+
+class ResumenVentaDiaria(Base):
+    __tablename__ = "resumen_venta_diaria"
+
+    fecha = Column(Date, primary_key=True)
+    producto_id = Column(Integer, ForeignKey("productos.id"), primary_key=True)
+    # 0 cuando la venta no tiene vendedor asignado
+    vendedor_id = Column(BigInteger, primary_key=True, default=0)
+    cantidad = Column(Integer, nullable=False, default=0)
+    monto = Column(DECIMAL(14, 2), nullable=False, default=0)
+
+
+class ResumenCompraDiaria(Base):
+    __tablename__ = "resumen_compra_diaria"
+
+    fecha = Column(Date, primary_key=True)
+    producto_id = Column(Integer, ForeignKey("productos.id"), primary_key=True)
+    proveedor_id = Column(Integer, ForeignKey("proveedores.id"), primary_key=True)
+    cantidad = Column(Integer, nullable=False, default=0)
+    monto = Column(DECIMAL(14, 2), nullable=False, default=0)
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, BigInteger
+from ..database import Base
+
+class Secuencia(Base):
+    __tablename__ = "secuencias"
+
+    nombre = Column(String(30), primary_key=True)
+    valor = Column(BigInteger, nullable=False, default=0)
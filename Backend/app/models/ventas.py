@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime, DECIMAL, String
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Computed, DECIMAL, String, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from ..database import Base
@@ -7,9 +7,14 @@ class Venta(Base):
     __tablename__ = "ventas"
     id = Column(Integer, primary_key=True, index=True)
     cliente_id = Column(Integer, ForeignKey("clientes.id"))
-    vendedor_id = Column(Integer, ForeignKey("usuario.id"), nullable=True)
-    fecha = Column(DateTime, default=datetime.now)
+    vendedor_id = Column(Integer, ForeignKey("usuario.id"), nullable=True, index=True)
+    fecha = Column(DateTime, default=datetime.now, nullable=False)
     orden_venta = Column(String(20), unique=True, nullable=False)
+    # Identificador del cliente en las ventas sin conexión (POST /ventas/batch)
+    uuid_cliente = Column(String(36), unique=True, nullable=True)
+
+    # Paginación por keyset y filtros por rango de fechas
+    __table_args__ = (Index("ix_ventas_fecha_id", "fecha", "id"),)
     
     cliente = relationship("Cliente", back_populates="ventas")
     vendedor = relationship("Usuario", back_populates="ventas")
@@ -22,6 +27,7 @@ class DetalleVenta(Base):
     producto_id = Column(Integer, ForeignKey("productos.id"))
     cantidad = Column(Integer, nullable=False)
     precio_unitario = Column(DECIMAL(10, 2), nullable=False)
+    total = Column(DECIMAL(10, 2), Computed("cantidad * precio_unitario", persisted=True))
 
 
     venta = relationship("Venta", back_populates="detalles")
@@ -0,0 +1,8 @@
+from sqlalchemy import Column, String, BigInteger
+from ..database import Base
+
+class VersionTabla(Base):
+    __tablename__ = "versiones_tablas"
+
+    tabla = Column(String(30), primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
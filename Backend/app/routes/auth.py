@@ -1,12 +1,19 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from passlib.context import CryptContext
+from fastapi.concurrency import run_in_threadpool
 from datetime import timedelta
-from ..database import SessionLocal, get_db
+from ..database import SessionLocal, get_db, get_async_db
 from ..models.usuario import Usuario
 from ..schemas.usuario_schema import UsuarioCreate, UsuarioOut, UsuarioLogin, Token
 from ..utils.jwt import crear_token, verificar_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from ..utils import contadores, metricas, versiones
+from ..utils.cache import CacheTTL
+from ..utils import hashing
+import os
+import time
 
 router = APIRouter(
     prefix="/auth",
@@ -14,33 +21,73 @@ router = APIRouter(
 )
 
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 security = HTTPBearer()
 
+# Tokens decodificados (token -> id de usuario) y usuarios resueltos (id -> usuario).
+# Las rutas que modifican usuarios invalidan la entrada; el TTL acota el desfase
+# entre procesos cuando se ejecutan varios workers.
+AUTH_CACHE_TTL = float(os.getenv("AUTH_CACHE_TTL_SEG", "60"))
+AUTH_CACHE_MAX = int(os.getenv("AUTH_CACHE_MAX", "1024"))
+_tokens_cache = CacheTTL(AUTH_CACHE_MAX, AUTH_CACHE_TTL)
+_usuarios_cache = CacheTTL(AUTH_CACHE_MAX, AUTH_CACHE_TTL)
+
 def hash_password(password: str) -> str:
-    """Hashea una contraseña"""
-    return pwd_context.hash(password)
+    """Hashea una contraseña en el pool de hashing (bloqueante)"""
+    return hashing.hashear_sync(password)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verifica una contraseña contra su hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+    """Verifica una contraseña contra su hash en el pool de hashing (bloqueante)"""
+    return hashing.verificar_sync(plain_password, hashed_password)
 
 def get_user_by_email(db: Session, email: str):
     """Obtiene un usuario por su correo electrónico"""
     return db.query(Usuario).filter(Usuario.correo == email).first()
 
-def authenticate_user(db: Session, email: str, password: str):
-    """Autentica un usuario verificando sus credenciales"""
-    user = get_user_by_email(db, email)
+async def get_user_by_email_async(db: AsyncSession, email: str):
+    """Obtiene un usuario por su correo electrónico (sesión asíncrona)"""
+    result = await db.execute(select(Usuario).where(Usuario.correo == email).limit(1))
+    return result.scalars().first()
+
+def _guardar_usuario(db: Session, user: Usuario):
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+
+async def authenticate_user(db: AsyncSession, email: str, password: str):
+    """Autentica un usuario verificando sus credenciales.
+
+    Si el hash usa un coste de bcrypt distinto del configurado se rehace
+    con la contraseña en claro que se acaba de verificar.
+    """
+    user = await get_user_by_email_async(db, email)
     if not user:
         return False
-    if not verify_password(password, user.contraseña):
+    valida, nuevo_hash = await hashing.verificar_y_actualizar(password, user.contraseña)
+    if not valida:
         return False
     if not user.is_active:
         return False
+    if nuevo_hash:
+        user.contraseña = nuevo_hash
+        await db.commit()
     return user
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
+def _copiar_usuario(user: Usuario) -> Usuario:
+    """Copia sin sesión (y sin contraseña) para guardar en la caché"""
+    return Usuario(
+        id=user.id,
+        nombre=user.nombre,
+        apellidos=user.apellidos,
+        correo=user.correo,
+        rol=user.rol,
+        is_active=user.is_active
+    )
+
+def invalidar_usuario(user_id: int):
+    """Descarta el usuario cacheado para que la próxima petición lo relea de la BD"""
+    _usuarios_cache.delete(user_id)
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: AsyncSession = Depends(get_async_db)):
     """Obtiene el usuario actual desde el token JWT"""
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -48,8 +95,14 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         headers={"WWW-Authenticate": "Bearer"},
     )
     
+    token = credentials.credentials
+    user_id = _tokens_cache.get(token)
+    if user_id is not None:
+        user = _usuarios_cache.get(user_id)
+        if user is not None:
+            return user
+
     try:
-        token = credentials.credentials
         payload = verificar_token(token)
         if payload is None:
             raise credentials_exception
@@ -59,16 +112,20 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
     except:
         raise credentials_exception
     
-    user = get_user_by_email(db, email=email)
-    if user is None:
+    user = await get_user_by_email_async(db, email=email)
+    if user is None or user.is_active is False:
         raise credentials_exception
+
+    user = _copiar_usuario(user)
+    _usuarios_cache.set(user.id, user)
+    _tokens_cache.set(token, user.id, ttl=payload["exp"] - time.time() if "exp" in payload else None)
     return user
 
 @router.post("/registro", response_model=UsuarioOut, status_code=status.HTTP_201_CREATED)
-def registrar_usuario(usuario: UsuarioCreate, db: Session = Depends(get_db)):
+async def registrar_usuario(usuario: UsuarioCreate, db: Session = Depends(get_db)):
     """Registra un nuevo usuario"""
 
-    db_user = get_user_by_email(db, email=usuario.correo)
+    db_user = await run_in_threadpool(get_user_by_email, db, usuario.correo)
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -76,7 +133,7 @@ def registrar_usuario(usuario: UsuarioCreate, db: Session = Depends(get_db)):
         )
     
 
-    hashed_password = hash_password(usuario.contraseña)
+    hashed_password = await hashing.hashear(usuario.contraseña)
     db_user = Usuario(
         nombre=usuario.nombre,
         apellidos=usuario.apellidos,
@@ -86,16 +143,17 @@ def registrar_usuario(usuario: UsuarioCreate, db: Session = Depends(get_db)):
         is_active=usuario.is_active
     )
     
-    db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await run_in_threadpool(_guardar_usuario, db, db_user)
+    contadores.registrar_alta("usuarios", db_user.is_active)
+    await run_in_threadpool(versiones.incrementar, "usuarios")
     
     return db_user
 
 @router.post("/login", response_model=Token)
-def login(user_credentials: UsuarioLogin, db: Session = Depends(get_db)):
+async def login(user_credentials: UsuarioLogin, db: AsyncSession = Depends(get_async_db)):
     """Autentica un usuario y devuelve un token JWT"""
-    user = authenticate_user(db, user_credentials.correo, user_credentials.contraseña)
+    user = await authenticate_user(db, user_credentials.correo, user_credentials.contraseña)
+    metricas.intentos_login.inc("ok" if user else "fallido")
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
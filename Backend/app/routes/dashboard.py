@@ -0,0 +1,168 @@
+from datetime import date, timedelta
+from typing import List, Optional
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from ..database import get_read_db
+from ..models.productos import Producto
+from ..models.proveedores import Proveedor
+from ..models.clientes import Cliente
+from ..models.compra import Compra, DetalleCompra
+from ..models.ventas import Venta, DetalleVenta
+from ..models.resumenes import ResumenVentaDiaria, ResumenCompraDiaria
+
+router = APIRouter(
+    prefix="/dashboard",
+    tags=["Dashboard"]
+)
+
+
+def contar(db: Session, modelo) -> int:
+    """Cuenta las filas de una tabla con COUNT(*)"""
+    return db.query(func.count()).select_from(modelo).scalar()
+
+def _productos_a_lista(productos):
+    return [{"id": p.id, "nombre": p.nombre, "stock": p.stock} for p in productos]
+
+def _ventas_recientes(db: Session, limite: int):
+    recientes = (
+        db.query(Venta.id)
+        .order_by(Venta.fecha.desc(), Venta.id.desc())
+        .limit(limite)
+        .subquery()
+    )
+    filas = (
+        db.query(
+            Venta.id, Venta.orden_venta, Venta.fecha, Cliente.id, Cliente.nombre,
+            func.count(DetalleVenta.id), func.coalesce(func.sum(DetalleVenta.total), 0)
+        )
+        .join(recientes, recientes.c.id == Venta.id)
+        .outerjoin(Cliente, Cliente.id == Venta.cliente_id)
+        .outerjoin(DetalleVenta, DetalleVenta.venta_id == Venta.id)
+        .group_by(Venta.id, Venta.orden_venta, Venta.fecha, Cliente.id, Cliente.nombre)
+        .order_by(Venta.fecha.desc(), Venta.id.desc())
+        .all()
+    )
+    return [
+        {
+            "id": id,
+            "orden_venta": orden,
+            "fecha": fecha.isoformat() if fecha else None,
+            "cliente": {"id": cliente_id, "nombre": cliente_nombre},
+            "productos": productos,
+            "total": float(total)
+        }
+        for id, orden, fecha, cliente_id, cliente_nombre, productos, total in filas
+    ]
+
+def _compras_recientes(db: Session, limite: int):
+    recientes = (
+        db.query(Compra.id)
+        .order_by(Compra.fecha.desc(), Compra.id.desc())
+        .limit(limite)
+        .subquery()
+    )
+    filas = (
+        db.query(
+            Compra.id, Compra.orden_compra, Compra.fecha, Proveedor.id, Proveedor.nombre,
+            func.count(DetalleCompra.id), func.coalesce(func.sum(DetalleCompra.total), 0)
+        )
+        .join(recientes, recientes.c.id == Compra.id)
+        .outerjoin(Proveedor, Proveedor.id == Compra.proveedor_id)
+        .outerjoin(DetalleCompra, DetalleCompra.compra_id == Compra.id)
+        .group_by(Compra.id, Compra.orden_compra, Compra.fecha, Proveedor.id, Proveedor.nombre)
+        .order_by(Compra.fecha.desc(), Compra.id.desc())
+        .all()
+    )
+    return [
+        {
+            "id": id,
+            "orden_compra": orden,
+            "fecha": fecha.isoformat() if fecha else None,
+            "proveedor": {"id": proveedor_id, "nombre": proveedor_nombre},
+            "productos": productos,
+            "total": float(total)
+        }
+        for id, orden, fecha, proveedor_id, proveedor_nombre, productos, total in filas
+    ]
+
+@router.get("/summary", response_model=dict)
+def obtener_resumen(
+    umbral_stock: int = Query(10, ge=0),
+    limite: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_read_db)
+):
+    """Resumen del dashboard calculado con agregados en SQL"""
+    total_ventas = db.query(func.coalesce(func.sum(DetalleVenta.total), 0)).scalar()
+    total_compras = db.query(func.coalesce(func.sum(DetalleCompra.total), 0)).scalar()
+
+    bajo_stock = db.query(Producto).filter(Producto.stock < umbral_stock)
+    productos_bajo_stock = bajo_stock.order_by(Producto.stock.asc(), Producto.id).limit(limite).all()
+    top_productos = (
+        db.query(Producto)
+        .filter(Producto.stock.isnot(None))
+        .order_by(Producto.stock.desc(), Producto.id)
+        .limit(limite)
+        .all()
+    )
+
+    return {
+        "total_ventas": float(total_ventas),
+        "total_compras": float(total_compras),
+        "total_productos": contar(db, Producto),
+        "total_clientes": contar(db, Cliente),
+        "total_proveedores": contar(db, Proveedor),
+        "umbral_stock": umbral_stock,
+        "total_bajo_stock": bajo_stock.with_entities(func.count()).scalar(),
+        "productos_bajo_stock": _productos_a_lista(productos_bajo_stock),
+        "top_productos": _productos_a_lista(top_productos),
+        "ventas_recientes": _ventas_recientes(db, limite),
+        "compras_recientes": _compras_recientes(db, limite)
+    }
+
+def _serie_diaria(db: Session, resumen, fecha_desde: Optional[date], fecha_hasta: Optional[date], filtros):
+    fecha_hasta = fecha_hasta or date.today()
+    fecha_desde = fecha_desde or fecha_hasta - timedelta(days=30)
+    filas = (
+        db.query(resumen.fecha, func.sum(resumen.cantidad), func.sum(resumen.monto))
+        .filter(resumen.fecha >= fecha_desde, resumen.fecha <= fecha_hasta, *filtros)
+        .group_by(resumen.fecha)
+        .order_by(resumen.fecha)
+        .all()
+    )
+    return [
+        {"fecha": fecha.isoformat(), "cantidad": int(cantidad), "monto": float(monto)}
+        for fecha, cantidad, monto in filas
+    ]
+
+@router.get("/ventas-diarias", response_model=List[dict])
+def ventas_diarias(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    producto_id: Optional[int] = None,
+    vendedor_id: Optional[int] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Ventas por día leídas desde el resumen diario (por defecto, últimos 30 días)"""
+    filtros = []
+    if producto_id:
+        filtros.append(ResumenVentaDiaria.producto_id == producto_id)
+    if vendedor_id:
+        filtros.append(ResumenVentaDiaria.vendedor_id == vendedor_id)
+    return _serie_diaria(db, ResumenVentaDiaria, fecha_desde, fecha_hasta, filtros)
+
+@router.get("/compras-diarias", response_model=List[dict])
+def compras_diarias(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    producto_id: Optional[int] = None,
+    proveedor_id: Optional[int] = None,
+    db: Session = Depends(get_read_db)
+):
+    """Compras por día leídas desde el resumen diario (por defecto, últimos 30 días)"""
+    filtros = []
+    if producto_id:
+        filtros.append(ResumenCompraDiaria.producto_id == producto_id)
+    if proveedor_id:
+        filtros.append(ResumenCompraDiaria.proveedor_id == proveedor_id)
+    return _serie_diaria(db, ResumenCompraDiaria, fecha_desde, fecha_hasta, filtros)
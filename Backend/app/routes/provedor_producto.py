@@ -1,59 +1,86 @@
 from ast import List
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from sqlalchemy.orm import Session, joinedload
-from ..database import SessionLocal
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from sqlalchemy.orm import Session, joinedload, selectinload
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from fastapi.concurrency import run_in_threadpool
+from ..database import get_db, get_read_db, get_async_db, get_async_read_db
 from ..models.productos import Producto
 from ..models.proveedores import Proveedor
 from ..models.clientes import Cliente
 from ..schemas.proveedores_schema import ProveedorCreate, ProveedorOut
 from ..schemas.clientes_schema import ClienteCreate, ClienteOut
 from ..schemas.producto_schema import ProductOut, ProductCreate, ProductoSchema
-from datetime import datetime
-from pathlib import Path
-import uuid
+from datetime import datetime, date, timedelta
+import os
 from ..models.tUnidad import TipoUnidad
 from ..schemas.tUnidad_schema import TUnidadCreate, TUnidadOut
 from sqlalchemy.orm import joinedload
-from typing import List
+from typing import List, Optional
 from ..schemas.compra_schema import CompraCreate
 from ..models.compra import Compra
 from ..models.compra import DetalleCompra
-from sqlalchemy import func
 from ..models.ventas import Venta, DetalleVenta
 from ..models.usuario import Usuario
-from ..schemas.ventas_schema import VentaCreate, VentaOut
+from ..schemas.ventas_schema import VentaCreate, VentaOut, VentaBatchCreate, VentaOfflineCreate
+from ..utils.paginacion import paginar_keyset, paginar_keyset_async
+from ..utils.resumenes import acumular_venta, acumular_ventas, acumular_compra
+from ..utils import busqueda, catalogo, contadores, exportacion, metricas, proyecciones, secuencias, versiones
+from ..utils.imagenes import guardar_imagen, liberar_imagen
+from ..utils.respuestas import RespuestaJSON
+from ..utils.stock import agrupar_cantidades, descontar_stock, sumar_stock
 
 router = APIRouter()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-IMAGES_DIR = BASE_DIR / "images"
-IMAGES_DIR.mkdir(exist_ok=True)
+VENTAS_BATCH_LOTE = int(os.getenv("VENTAS_BATCH_LOTE", "100"))
 
 #################################PRODUCTOS#################################
 
-@router.get("/productos/", response_model=List[ProductOut])
-def get_productos(db: Session = Depends(get_db)):
-    productos = db.query(Producto).options(
+def _producto_select():
+    # En una sesión asíncrona no hay lazy load: las relaciones que serializa
+    # ProductOut se cargan siempre de antemano
+    return select(Producto).options(
         joinedload(Producto.tipo_unidad),
-        joinedload(Producto.proveedores)
-    ).all()
-    return productos
+        selectinload(Producto.proveedores)
+    )
+
+@router.get("/productos/", response_model=List[ProductOut])
+async def get_productos(rapido: bool = False, db: AsyncSession = Depends(get_async_db)):
+    if rapido:
+        async def cargar_rapido():
+            filas = (await db.execute(proyecciones.productos_select())).all()
+            relaciones = (await db.execute(proyecciones.proveedores_de_productos_select())).all()
+            return proyecciones.productos_a_dicts(filas, relaciones)
+        return RespuestaJSON(await catalogo.obtener_async(("productos", "rapido"), cargar_rapido))
+
+    async def cargar():
+        result = await db.execute(_producto_select())
+        return [ProductOut.model_validate(p) for p in result.scalars().all()]
+    return await catalogo.obtener_async(("productos",), cargar)
+
+@router.get("/productos/search", response_model=List[ProductOut])
+async def buscar_productos(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    if not busqueda.productos.vigente():
+        await run_in_threadpool(busqueda.productos.asegurar)
+    ids = busqueda.productos.buscar(q, limit)
+    if not ids:
+        return []
+    result = await db.execute(_producto_select().where(Producto.id.in_(ids)))
+    por_id = {producto.id: producto for producto in result.scalars().all()}
+    return [por_id[id] for id in ids if id in por_id]
 
 @router.get("/productos/{producto_id}", response_model=ProductOut)
-def get_producto(producto_id: int, db: Session = Depends(get_db)):
-    producto = (
-        db.query(Producto)
-        .options(joinedload(Producto.tipo_unidad), joinedload(Producto.proveedores))
-        .filter(Producto.id == producto_id)
-        .first()
-    )
+async def get_producto(producto_id: int, db: AsyncSession = Depends(get_async_db)):
+    async def cargar():
+        result = await db.execute(_producto_select().where(Producto.id == producto_id))
+        producto = result.scalars().first()
+        return ProductOut.model_validate(producto) if producto else None
+    producto = await catalogo.obtener_async(("producto", producto_id), cargar)
     if not producto:
         raise HTTPException(status_code=404, detail="Producto no encontrado")
     return producto
@@ -80,20 +107,7 @@ async def create_producto(
     }
 
     if imagen and imagen.filename:
-        if not imagen.content_type.startswith("image/"):
-            raise HTTPException(status_code=400, detail="El archivo debe ser una imagen")
-
-        file_extension = imagen.filename.split(".")[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        file_path = IMAGES_DIR / unique_filename
-
-        try:
-            contents = await imagen.read()
-            with open(file_path, "wb") as f:
-                f.write(contents)
-            producto_data["imagen"] = f"/images/{unique_filename}"
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error al guardar la imagen: {e}")
+        producto_data["imagen"] = await guardar_imagen(imagen)
 
     db_producto = Producto(**producto_data)
 
@@ -106,6 +120,10 @@ async def create_producto(
     db.add(db_producto)
     db.commit()
     db.refresh(db_producto)
+    contadores.registrar_alta("productos", db_producto.is_active)
+    catalogo.invalidar_productos([db_producto.id])
+    busqueda.productos.actualizar(db_producto)
+    await run_in_threadpool(versiones.incrementar, "productos")
     return db_producto
 
 
@@ -139,28 +157,21 @@ async def update_producto(
             raise HTTPException(status_code=404, detail="Proveedor no encontrado")
         producto.proveedores = [proveedor] 
 
+    imagen_anterior = producto.imagen
     if imagen and imagen.filename:
-        if not imagen.content_type.startswith("image/"):
-            raise HTTPException(status_code=400, detail="El archivo debe ser una imagen")
-
-        file_extension = imagen.filename.split(".")[-1]
-        unique_filename = f"{uuid.uuid4()}.{file_extension}"
-        file_path = IMAGES_DIR / unique_filename
-
-        try:
-            contents = await imagen.read()
-            with open(file_path, "wb") as f:
-                f.write(contents)
-            producto.imagen = f"/images/{unique_filename}"
-        except Exception as e:
-            raise HTTPException(status_code=500, detail=f"Error al guardar la imagen: {e}")
+        producto.imagen = await guardar_imagen(imagen)
 
     db.commit()
     db.refresh(producto)
+    catalogo.invalidar_productos([producto_id])
+    busqueda.productos.actualizar(producto)
+    await run_in_threadpool(versiones.incrementar, "productos")
+    if producto.imagen != imagen_anterior:
+        liberar_imagen(db, imagen_anterior)
     return producto
 
 @router.get("/productos/proveedor/{proveedor_id}", response_model=List[ProductOut])
-def get_productos_por_proveedor(proveedor_id: int, db: Session = Depends(get_db)):
+def get_productos_por_proveedor(proveedor_id: int, db: Session = Depends(get_read_db)):
     productos = (
         db.query(Producto)
         .options(joinedload(Producto.tipo_unidad), joinedload(Producto.proveedores))
@@ -174,7 +185,9 @@ def get_productos_por_proveedor(proveedor_id: int, db: Session = Depends(get_db)
 
 @router.get("/tipo-unidad/", response_model=list[TUnidadOut])
 def get_unidades(db: Session = Depends(get_db)):
-    return db.query(TipoUnidad).all()
+    return catalogo.obtener(
+        ("tipo_unidad",), lambda: [TUnidadOut.model_validate(u) for u in db.query(TipoUnidad).all()]
+    )
 
 @router.post("/tipo-unidad/")
 def crear_tipo_unidad(unidad: TUnidadCreate, db: Session = Depends(get_db)):
@@ -182,6 +195,8 @@ def crear_tipo_unidad(unidad: TUnidadCreate, db: Session = Depends(get_db)):
     db.add(nueva_unidad)
     db.commit()
     db.refresh(nueva_unidad)
+    catalogo.invalidar("tipo_unidad")
+    versiones.incrementar("tipo_unidad")
     return nueva_unidad
 
 @router.delete("/tipo-unidad/{unidad_id}")
@@ -191,13 +206,27 @@ def eliminar_unidad(unidad_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Unidad no encontrada")
     db.delete(unidad)
     db.commit()
+    # Los productos incluyen su unidad
+    catalogo.invalidar("tipo_unidad", "productos", "producto")
+    versiones.incrementar("tipo_unidad")
     return {"message": "Unidad eliminada correctamente"}
 
 #################################PROVEEDORES#################################
 
 @router.get("/proveedores/", response_model=list[ProveedorOut])
 def read_proveedores(db: Session = Depends(get_db)):
-    return db.query(Proveedor).all()
+    return catalogo.obtener(
+        ("proveedores",), lambda: [ProveedorOut.model_validate(p) for p in db.query(Proveedor).all()]
+    )
+
+@router.get("/proveedores/sugerencias", response_model=list[ProveedorOut])
+def sugerir_proveedores(
+    q: str = "",
+    campo: Optional[str] = Query(None, pattern="^(documento|nombre)$"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    busqueda.sugerencias_proveedores.asegurar()
+    return busqueda.sugerencias_proveedores.sugerir(q, limit, campo)
 
 @router.get("/proveedores/{proveedor_id}", response_model=dict)
 def obtener_proveedor(proveedor_id: int, db: Session = Depends(get_db)):
@@ -235,6 +264,10 @@ def actualizar_proveedor(proveedor_id: int, proveedor_data: dict, db: Session =
         proveedor.direccion = proveedor_data.get("direccion", proveedor.direccion)
         
         db.commit()
+        # Los productos incluyen sus proveedores
+        catalogo.invalidar("proveedores", "productos", "producto")
+        versiones.incrementar("proveedores")
+        busqueda.sugerencias_proveedores.actualizar(proveedor)
         return {"message": "Proveedor actualizado correctamente"}
     except Exception as e:
         db.rollback()
@@ -247,13 +280,19 @@ def create_proveedor(proveedor: ProveedorCreate, db: Session = Depends(get_db)):
     db.add(db_proveedor)
     db.commit()
     db.refresh(db_proveedor)
+    contadores.registrar_alta("proveedores", db_proveedor.is_active)
+    catalogo.invalidar("proveedores")
+    versiones.incrementar("proveedores")
+    busqueda.sugerencias_proveedores.actualizar(db_proveedor)
     return db_proveedor
 
 ##########################CLIENTES######################################
 
 @router.get("/clientes/", response_model=list[ClienteOut])
 def read_clientes(db: Session = Depends(get_db)):
-    return db.query(Cliente).all()
+    return catalogo.obtener(
+        ("clientes",), lambda: [ClienteOut.model_validate(c) for c in db.query(Cliente).all()]
+    )
 
 @router.post("/clientes/", response_model=ClienteOut)
 def create_clientes(cliente: ClienteCreate, db: Session = Depends(get_db)):
@@ -261,8 +300,35 @@ def create_clientes(cliente: ClienteCreate, db: Session = Depends(get_db)):
     db.add(db_cliente)
     db.commit()
     db.refresh(db_cliente)
+    contadores.registrar_alta("clientes", db_cliente.is_active)
+    catalogo.invalidar("clientes")
+    versiones.incrementar("clientes")
+    busqueda.clientes.actualizar(db_cliente)
+    busqueda.sugerencias_clientes.actualizar(db_cliente)
     return db_cliente
 
+@router.get("/clientes/search", response_model=list[ClienteOut])
+def buscar_clientes(
+    q: str = Query(..., min_length=1),
+    limit: int = Query(20, ge=1, le=100),
+    db: Session = Depends(get_read_db)
+):
+    busqueda.clientes.asegurar()
+    ids = busqueda.clientes.buscar(q, limit)
+    if not ids:
+        return []
+    por_id = {cliente.id: cliente for cliente in db.query(Cliente).filter(Cliente.id.in_(ids)).all()}
+    return [por_id[id] for id in ids if id in por_id]
+
+@router.get("/clientes/sugerencias", response_model=list[ClienteOut])
+def sugerir_clientes(
+    q: str = "",
+    campo: Optional[str] = Query(None, pattern="^(documento|nombre)$"),
+    limit: int = Query(10, ge=1, le=50)
+):
+    busqueda.sugerencias_clientes.asegurar()
+    return busqueda.sugerencias_clientes.sugerir(q, limit, campo)
+
 @router.get("/clientes/{cliente_id}", response_model=dict)
 def obtener_cliente(cliente_id: int, db: Session = Depends(get_db)):
     try:
@@ -299,6 +365,10 @@ def actualizar_cliente(cliente_id: int, cliente_data: dict, db: Session = Depend
         cliente.direccion = cliente_data.get("direccion", cliente.direccion)
         
         db.commit()
+        catalogo.invalidar("clientes")
+        versiones.incrementar("clientes")
+        busqueda.clientes.actualizar(cliente)
+        busqueda.sugerencias_clientes.actualizar(cliente)
         return {"message": "Cliente actualizado correctamente"}
     except Exception as e:
         db.rollback()
@@ -310,12 +380,9 @@ def actualizar_cliente(cliente_id: int, cliente_data: dict, db: Session = Depend
 @router.post("/compras/")
 def crear_compra(compra: CompraCreate, db: Session = Depends(get_db)):
 
-    ultimo_orden = db.query(func.max(Compra.orden_compra)).scalar()
-    if ultimo_orden and ultimo_orden.isdigit():
-        nuevo_numero = int(ultimo_orden) + 1
-    else:
-        nuevo_numero = 1
-    orden_formateada = f"{nuevo_numero:07d}"
+    cantidades = agrupar_cantidades(compra.productos)
+    sumar_stock(db, cantidades)
+    orden_formateada = secuencias.siguiente("compra")
 
     total_calculado = sum(item.cantidad * item.precio_unitario for item in compra.productos)
 
@@ -328,23 +395,21 @@ def crear_compra(compra: CompraCreate, db: Session = Depends(get_db)):
     db.add(nueva_compra)
     db.flush()
 
-    for item in compra.productos:
-        producto = db.query(Producto).filter(Producto.id == item.producto_id).first()
-        if not producto:
-            raise HTTPException(status_code=404, detail=f"Producto ID {item.producto_id} no encontrado")
-
-        detalle = DetalleCompra(
-            compra_id=nueva_compra.id,
-            producto_id=item.producto_id,
-            cantidad=item.cantidad,
-            precio_unitario=item.precio_unitario,
-        )
-        db.add(detalle)
-
-        producto.stock += item.cantidad
+    db.execute(insert(DetalleCompra), [
+        {
+            "compra_id": nueva_compra.id,
+            "producto_id": item.producto_id,
+            "cantidad": item.cantidad,
+            "precio_unitario": item.precio_unitario,
+        }
+        for item in compra.productos
+    ])
 
+    acumular_compra(db, nueva_compra.fecha, compra.proveedor_id, compra.productos)
     db.commit()
     db.refresh(nueva_compra)
+    catalogo.invalidar_productos(cantidades)
+    versiones.incrementar("compras", "productos")
 
     return {
         "message": "Compra registrada correctamente",
@@ -354,21 +419,73 @@ def crear_compra(compra: CompraCreate, db: Session = Depends(get_db)):
     }
 
 @router.get("/compras/siguiente-numero")
-def obtener_siguiente_numero(db: Session = Depends(get_db)):
-    ultima_compra = db.query(Compra).order_by(Compra.id.desc()).first()
-    numero = ultima_compra.id + 1 if ultima_compra else 1
-    return {"numero_orden": f"{numero:07d}"}
+def obtener_siguiente_numero():
+    return {"numero_orden": secuencias.vistazo("compra"), "estimado": True}
+
+
+def _compra_query(db: Session):
+    return db.query(Compra).options(
+        joinedload(Compra.proveedor),
+        selectinload(Compra.detalles).joinedload(DetalleCompra.producto)
+    )
 
+def _detalle_a_dict(detalle, sin_producto: str):
+    producto = detalle.producto
+    return {
+        "id": detalle.id,
+        "producto": {
+            "id": producto.id if producto else None,
+            "nombre": producto.nombre if producto else sin_producto
+        },
+        "cantidad": detalle.cantidad,
+        "precio_unitario": float(detalle.precio_unitario),
+        "total": float(detalle.cantidad * detalle.precio_unitario)
+    }
 
-@router.get("/compras/", response_model=List[dict])
-def listar_compras(db: Session = Depends(get_db)):
+def _filtrar_fechas(query, columna, fecha_desde: Optional[date], fecha_hasta: Optional[date]):
+    if fecha_desde:
+        query = query.filter(columna >= fecha_desde)
+    if fecha_hasta:
+        query = query.filter(columna < fecha_hasta + timedelta(days=1))
+    return query
+
+@router.get("/compras/export")
+def exportar_compras(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    formato: str = "csv"
+):
+    stmt = _filtrar_fechas(exportacion.compras_select(), Compra.fecha, fecha_desde, fecha_hasta)
+    return exportacion.exportar(stmt, "compras", formato, fecha_desde, fecha_hasta)
+
+@router.get("/compras/", response_model=dict)
+def listar_compras(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    proveedor_id: Optional[int] = None,
+    orden: Optional[str] = None,
+    rapido: bool = False,
+    db: Session = Depends(get_read_db)
+):
     try:
-        compras = db.query(Compra).all()
+        base = proyecciones.compras_query(db) if rapido else _compra_query(db)
+        query = _filtrar_fechas(base, Compra.fecha, fecha_desde, fecha_hasta)
+        if proveedor_id:
+            query = query.filter(Compra.proveedor_id == proveedor_id)
+        if orden:
+            query = query.filter(Compra.orden_compra.startswith(orden, autoescape=True))
+
+        compras, next_cursor = paginar_keyset(query, Compra.fecha, Compra.id, cursor, limit)
+
+        if rapido:
+            detalles = db.execute(proyecciones.detalles_compra_select([c.id for c in compras])).all() if compras else []
+            return RespuestaJSON({"items": proyecciones.compras_a_dicts(compras, detalles), "next_cursor": next_cursor})
         
         result = []
         for compra in compras:
-           
-            proveedor = db.query(Proveedor).filter(Proveedor.id == compra.proveedor_id).first()
+            proveedor = compra.proveedor
             
             compra_data = {
                 "id": compra.id,
@@ -379,30 +496,13 @@ def listar_compras(db: Session = Depends(get_db)):
                     "nombre": proveedor.nombre if proveedor else "N/A",
                     "documento": proveedor.documento if proveedor else "N/A"
                 },
-                "detalles": []
+                "detalles": [_detalle_a_dict(detalle, "N/A") for detalle in compra.detalles]
             }
-            
-            
-            detalles = db.query(DetalleCompra).filter(DetalleCompra.compra_id == compra.id).all()
-            
-            for detalle in detalles:
-                producto = db.query(Producto).filter(Producto.id == detalle.producto_id).first()
-                
-                detalle_data = {
-                    "id": detalle.id,
-                    "producto": {
-                        "id": producto.id if producto else None,
-                        "nombre": producto.nombre if producto else "N/A"
-                    },
-                    "cantidad": detalle.cantidad,
-                    "precio_unitario": float(detalle.precio_unitario),
-                    "total": float(detalle.cantidad * detalle.precio_unitario)
-                }
-                compra_data["detalles"].append(detalle_data)
-            
             result.append(compra_data)
         
-        return result
+        return {"items": result, "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error en listar_compras: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -410,14 +510,13 @@ def listar_compras(db: Session = Depends(get_db)):
 @router.get("/compras/{compra_id}", response_model=dict)
 def obtener_compra(compra_id: int, db: Session = Depends(get_db)):
     try:
-        compra = db.query(Compra).filter(Compra.id == compra_id).first()
+        compra = _compra_query(db).filter(Compra.id == compra_id).first()
         if not compra:
             raise HTTPException(status_code=404, detail="Compra no encontrada")
         
-    
-        proveedor = db.query(Proveedor).filter(Proveedor.id == compra.proveedor_id).first()
+        proveedor = compra.proveedor
         
-        compra_data = {
+        return {
             "id": compra.id,
             "orden_compra": compra.orden_compra,
             "fecha": compra.fecha.isoformat() if compra.fecha else None,
@@ -428,28 +527,10 @@ def obtener_compra(compra_id: int, db: Session = Depends(get_db)):
                 "correo": proveedor.correo if proveedor else "N/A",
                 "telefono": proveedor.telefono if proveedor else "N/A"
             },
-            "detalles": []
+            "detalles": [_detalle_a_dict(detalle, "Producto no encontrado") for detalle in compra.detalles]
         }
-        
- 
-        detalles = db.query(DetalleCompra).filter(DetalleCompra.compra_id == compra.id).all()
-        
-        for detalle in detalles:
-            producto = db.query(Producto).filter(Producto.id == detalle.producto_id).first()
-            
-            detalle_data = {
-                "id": detalle.id,
-                "producto": {
-                    "id": producto.id if producto else None,
-                    "nombre": producto.nombre if producto else "Producto no encontrado"
-                },
-                "cantidad": detalle.cantidad,
-                "precio_unitario": float(detalle.precio_unitario),
-                "total": float(detalle.cantidad * detalle.precio_unitario)
-            }
-            compra_data["detalles"].append(detalle_data)
-        
-        return compra_data
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error en obtener_compra: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -457,14 +538,18 @@ def obtener_compra(compra_id: int, db: Session = Depends(get_db)):
 ##########################VENTAS##############################
 
 @router.post("/ventas/", response_model=VentaOut)
-def crear_venta(venta: VentaCreate, db: Session = Depends(get_db)):
+async def crear_venta(venta: VentaCreate, db: AsyncSession = Depends(get_async_db)):
 
-    ultimo_orden = db.query(func.max(Venta.orden_venta)).scalar()
-    if ultimo_orden and ultimo_orden.isdigit():
-        nuevo_numero = int(ultimo_orden) + 1
-    else:
-        nuevo_numero = 1
-    orden_formateada = f"{nuevo_numero:07d}"
+    # Las utilidades de stock y resúmenes son síncronas: run_sync las ejecuta
+    # sobre la misma conexión y transacción sin ocupar un hilo
+    cantidades = agrupar_cantidades(venta.detalles)
+    try:
+        await db.run_sync(descontar_stock, cantidades)
+    except HTTPException as e:
+        if e.status_code == 409:
+            metricas.rechazos_stock.inc()
+        raise
+    orden_formateada = await run_in_threadpool(secuencias.siguiente, "venta")
 
     nueva_venta = Venta(
         cliente_id=venta.cliente_id,
@@ -474,140 +559,268 @@ def crear_venta(venta: VentaCreate, db: Session = Depends(get_db)):
     )
 
     db.add(nueva_venta)
-    db.flush() 
-
-    for item in venta.detalles:
-        detalle = DetalleVenta(
-            venta_id=nueva_venta.id,
-            producto_id=item.producto_id,
-            cantidad=item.cantidad,
-            precio_unitario=item.precio_unitario,
-        )
-        db.add(detalle)
-
-        producto = db.query(Producto).filter(Producto.id == item.producto_id).first()
-        if producto:
-            producto.stock -= item.cantidad
+    await db.flush()
+
+    await db.execute(insert(DetalleVenta), [
+        {
+            "venta_id": nueva_venta.id,
+            "producto_id": item.producto_id,
+            "cantidad": item.cantidad,
+            "precio_unitario": item.precio_unitario,
+        }
+        for item in venta.detalles
+    ])
 
-    db.commit()
-    db.refresh(nueva_venta)
+    await db.run_sync(acumular_venta, nueva_venta.fecha, venta.vendedor_id, venta.detalles)
+    await db.commit()
+    await db.refresh(nueva_venta, attribute_names=["detalles"])
+    catalogo.invalidar_productos(cantidades)
+    await run_in_threadpool(versiones.incrementar, "ventas", "productos")
+    metricas.ventas_creadas.inc()
 
     return nueva_venta
 
-@router.get("/ventas/", response_model=List[dict])
-def listar_ventas(db: Session = Depends(get_db)):
+def _fecha_venta(venta) -> datetime:
+    """Fecha original de una venta sin conexión (hora local, sin zona), o ahora si no la trae"""
+    if venta.fecha is None:
+        return datetime.now()
+    if venta.fecha.tzinfo is not None:
+        return venta.fecha.astimezone().replace(tzinfo=None)
+    return venta.fecha
+
+def _registrar_lote_ventas(db: Session, ventas: List[VentaOfflineCreate], desplazamiento: int, reintento: bool = False):
+    errores = {}
+
+    # Un reintento del cliente tras un timeout reenvía ventas ya registradas:
+    # las que tienen un uuid_cliente conocido (o repetido en el lote) no se insertan
+    uuids = {venta.uuid_cliente for venta in ventas if venta.uuid_cliente}
+    existentes = {}
+    if uuids:
+        existentes = {
+            uuid: (id, orden)
+            for uuid, id, orden in db.execute(
+                select(Venta.uuid_cliente, Venta.id, Venta.orden_venta).where(Venta.uuid_cliente.in_(uuids))
+            )
+        }
+    primera = {}
+    repetidas = {}
+    pendientes = []
+    for i, venta in enumerate(ventas):
+        uuid = venta.uuid_cliente
+        if uuid in existentes:
+            continue
+        if uuid in primera:
+            repetidas[i] = primera[uuid]
+        else:
+            if uuid:
+                primera[uuid] = i
+            pendientes.append(i)
+
+    # Un cliente o vendedor inexistente solo rechaza su venta: si llegara al
+    # flush, la violación de clave foránea desharía el lote entero
+    clientes = {ventas[i].cliente_id for i in pendientes}
+    vendedores = {ventas[i].vendedor_id for i in pendientes if ventas[i].vendedor_id is not None}
+    clientes_validos = set(db.scalars(select(Cliente.id).where(Cliente.id.in_(clientes)))) if clientes else set()
+    vendedores_validos = set(db.scalars(select(Usuario.id).where(Usuario.id.in_(vendedores)))) if vendedores else set()
+    for i in pendientes:
+        venta = ventas[i]
+        if venta.cliente_id not in clientes_validos:
+            errores[i] = f"Cliente {venta.cliente_id} no encontrado"
+        elif venta.vendedor_id is not None and venta.vendedor_id not in vendedores_validos:
+            errores[i] = f"Vendedor {venta.vendedor_id} no encontrado"
+    pendientes = [i for i in pendientes if i not in errores]
+
+    # Primero se intenta descontar el stock de todo el lote con un único UPDATE;
+    # si alguna venta sobrevende se repite venta por venta para aislarla.
     try:
-        ventas = db.query(Venta).all()
-        
-        result = []
-        for venta in ventas:
-           
-            cliente = db.query(Cliente).filter(Cliente.id == venta.cliente_id).first()
-            
-           
-            vendedor = None
-            if venta.vendedor_id:
-                vendedor = db.query(Usuario).filter(Usuario.id == venta.vendedor_id).first()
-            
-            venta_data = {
-                "id": venta.id,
-                "orden_venta": venta.orden_venta,
-                "fecha": venta.fecha.isoformat() if venta.fecha else None,
-                "cliente": {
-                    "id": cliente.id if cliente else None,
-                    "nombre": cliente.nombre if cliente else "Sin cliente",
-                    "documento": cliente.documento if cliente else "N/A"
-                },
-                "vendedor": {
-                    "id": vendedor.id if vendedor else None,
-                    "nombre": f"{vendedor.nombre} {vendedor.apellidos}" if vendedor else "Sin vendedor",
-                    "rol": vendedor.rol if vendedor else "N/A"
-                },
-                "detalles": []
+        descontar_stock(db, agrupar_cantidades(item for i in pendientes for item in ventas[i].detalles))
+        aceptadas = pendientes
+    except HTTPException:
+        aceptadas = []
+        for i in pendientes:
+            try:
+                descontar_stock(db, agrupar_cantidades(ventas[i].detalles))
+                aceptadas.append(i)
+            except HTTPException as e:
+                errores[i] = e.detail
+                if e.status_code == 409:
+                    metricas.rechazos_stock.inc()
+
+    creadas = {}
+    try:
+        if aceptadas:
+            numeros = secuencias.reservar("venta", len(aceptadas))
+            nuevas = {
+                i: Venta(
+                    cliente_id=ventas[i].cliente_id,
+                    vendedor_id=ventas[i].vendedor_id,
+                    orden_venta=secuencias.formatear(numero),
+                    fecha=_fecha_venta(ventas[i]),
+                    uuid_cliente=ventas[i].uuid_cliente,
+                )
+                for i, numero in zip(aceptadas, numeros)
             }
-            
-           
-            detalles = db.query(DetalleVenta).filter(DetalleVenta.venta_id == venta.id).all()
-            
-            for detalle in detalles:
-                producto = db.query(Producto).filter(Producto.id == detalle.producto_id).first()
-                
-                detalle_data = {
-                    "id": detalle.id,
-                    "producto": {
-                        "id": producto.id if producto else None,
-                        "nombre": producto.nombre if producto else "Producto no encontrado"
-                    },
-                    "cantidad": detalle.cantidad,
-                    "precio_unitario": float(detalle.precio_unitario),
-                    "total": float(detalle.cantidad * detalle.precio_unitario)
+            db.add_all(nuevas.values())
+            db.flush()
+
+            db.execute(insert(DetalleVenta), [
+                {
+                    "venta_id": nueva.id,
+                    "producto_id": item.producto_id,
+                    "cantidad": item.cantidad,
+                    "precio_unitario": item.precio_unitario,
                 }
-                venta_data["detalles"].append(detalle_data)
-            
-            result.append(venta_data)
-        
-        return result
+                for i, nueva in nuevas.items()
+                for item in ventas[i].detalles
+            ])
+            # Los resúmenes se acumulan en el día de la venta, no en el del reenvío
+            acumular_ventas(db, [
+                (nueva.fecha, ventas[i].vendedor_id, ventas[i].detalles) for i, nueva in nuevas.items()
+            ])
+            creadas = {i: (nueva.id, nueva.orden_venta) for i, nueva in nuevas.items()}
+        db.commit()
+        catalogo.invalidar_productos({item.producto_id for i in aceptadas for item in ventas[i].detalles})
+        versiones.incrementar("ventas", "productos")
+        metricas.ventas_creadas.inc(cantidad=len(creadas))
+    except Exception as e:
+        db.rollback()
+        if isinstance(e, IntegrityError) and e.orig.args[0] == 1062 and uuids and not reintento:
+            # Clave duplicada (1062): otra petición registró a la vez alguno de los
+            # uuid_cliente; se vuelve a filtrar el lote
+            return _registrar_lote_ventas(db, ventas, desplazamiento, reintento=True)
+        print(f"Error en crear_ventas_batch: {e}")
+        for i in aceptadas:
+            errores[i] = str(e)
+        creadas = {}
+
+    resultados = []
+    for i, venta in enumerate(ventas):
+        # Una repetida dentro del lote toma el resultado de su primera aparición
+        original = repetidas.get(i, i)
+        if venta.uuid_cliente in existentes:
+            id, orden = existentes[venta.uuid_cliente]
+        else:
+            id, orden = creadas.get(original, (None, None))
+        resultados.append({
+            "indice": desplazamiento + i,
+            "id": id,
+            "orden_venta": orden,
+            "duplicada": venta.uuid_cliente in existentes or i in repetidas,
+            "error": errores.get(original)
+        })
+    return resultados
+
+@router.post("/ventas/batch", response_model=dict)
+def crear_ventas_batch(
+    payload: VentaBatchCreate,
+    lote: int = Query(VENTAS_BATCH_LOTE, ge=1, le=1000),
+    db: Session = Depends(get_db)
+):
+    resultados = []
+    for inicio in range(0, len(payload.ventas), lote):
+        resultados.extend(_registrar_lote_ventas(db, payload.ventas[inicio:inicio + lote], inicio))
+
+    duplicadas = sum(1 for resultado in resultados if resultado["duplicada"] and resultado["error"] is None)
+    creadas = sum(1 for resultado in resultados if resultado["error"] is None) - duplicadas
+    return {
+        "creadas": creadas,
+        "duplicadas": duplicadas,
+        "rechazadas": len(resultados) - creadas - duplicadas,
+        "resultados": resultados
+    }
+
+def _venta_query(db: Session):
+    return db.query(Venta).options(
+        joinedload(Venta.cliente),
+        joinedload(Venta.vendedor),
+        selectinload(Venta.detalles).joinedload(DetalleVenta.producto)
+    )
+
+def _venta_select():
+    return select(Venta).options(
+        joinedload(Venta.cliente),
+        joinedload(Venta.vendedor),
+        selectinload(Venta.detalles).joinedload(DetalleVenta.producto)
+    )
+
+def _venta_a_dict(venta):
+    cliente = venta.cliente
+    vendedor = venta.vendedor
+    return {
+        "id": venta.id,
+        "orden_venta": venta.orden_venta,
+        "fecha": venta.fecha.isoformat() if venta.fecha else None,
+        "cliente": {
+            "id": cliente.id if cliente else None,
+            "nombre": cliente.nombre if cliente else "Sin cliente",
+            "documento": cliente.documento if cliente else "N/A"
+        },
+        "vendedor": {
+            "id": vendedor.id if vendedor else None,
+            "nombre": f"{vendedor.nombre} {vendedor.apellidos}" if vendedor else "Sin vendedor",
+            "rol": vendedor.rol if vendedor else "N/A"
+        },
+        "detalles": [_detalle_a_dict(detalle, "Producto no encontrado") for detalle in venta.detalles]
+    }
+
+@router.get("/ventas/export")
+def exportar_ventas(
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    formato: str = "csv"
+):
+    stmt = _filtrar_fechas(exportacion.ventas_select(), Venta.fecha, fecha_desde, fecha_hasta)
+    return exportacion.exportar(stmt, "ventas", formato, fecha_desde, fecha_hasta)
+
+@router.get("/ventas/", response_model=dict)
+async def listar_ventas(
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    fecha_desde: Optional[date] = None,
+    fecha_hasta: Optional[date] = None,
+    cliente_id: Optional[int] = None,
+    vendedor_id: Optional[int] = None,
+    orden: Optional[str] = None,
+    rapido: bool = False,
+    db: AsyncSession = Depends(get_async_read_db)
+):
+    try:
+        base = proyecciones.ventas_select() if rapido else _venta_select()
+        stmt = _filtrar_fechas(base, Venta.fecha, fecha_desde, fecha_hasta)
+        if cliente_id:
+            stmt = stmt.filter(Venta.cliente_id == cliente_id)
+        if vendedor_id:
+            stmt = stmt.filter(Venta.vendedor_id == vendedor_id)
+        if orden:
+            stmt = stmt.filter(Venta.orden_venta.startswith(orden, autoescape=True))
+
+        ventas, next_cursor = await paginar_keyset_async(
+            db, stmt, Venta.fecha, Venta.id, cursor, limit, escalares=not rapido
+        )
+        if rapido:
+            detalles = (await db.execute(proyecciones.detalles_venta_select([v.id for v in ventas]))).all() if ventas else []
+            return RespuestaJSON({"items": proyecciones.ventas_a_dicts(ventas, detalles), "next_cursor": next_cursor})
+        return {"items": [_venta_a_dict(venta) for venta in ventas], "next_cursor": next_cursor}
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error en listar_ventas: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/ventas/siguiente-numero")
-def obtener_siguiente_numero(db: Session = Depends(get_db)):
-    ultima_venta = db.query(Venta).order_by(Venta.id.desc()).first()
-    numero = ultima_venta.id + 1 if ultima_venta else 1
-    return {"numero_orden": f"{numero:07d}"}
+def obtener_siguiente_numero_venta():
+    # Estimación para la vista previa; el número asignado llega en la respuesta de POST /ventas/
+    return {"numero_orden": secuencias.vistazo("venta"), "estimado": True}
 
 @router.get("/ventas/{venta_id}", response_model=dict)
 def obtener_venta(venta_id: int, db: Session = Depends(get_db)):
     try:
-        venta = db.query(Venta).filter(Venta.id == venta_id).first()
+        venta = _venta_query(db).filter(Venta.id == venta_id).first()
         if not venta:
             raise HTTPException(status_code=404, detail="Venta no encontrada")
-        
-       
-        cliente = db.query(Cliente).filter(Cliente.id == venta.cliente_id).first()
-        
-       
-        vendedor = None
-        if venta.vendedor_id:
-            vendedor = db.query(Usuario).filter(Usuario.id == venta.vendedor_id).first()
-        
-        venta_data = {
-            "id": venta.id,
-            "orden_venta": venta.orden_venta,
-            "fecha": venta.fecha.isoformat() if venta.fecha else None,
-            "cliente": {
-                "id": cliente.id if cliente else None,
-                "nombre": cliente.nombre if cliente else "Sin cliente",
-                "documento": cliente.documento if cliente else "N/A"
-            },
-            "vendedor": {
-                "id": vendedor.id if vendedor else None,
-                "nombre": f"{vendedor.nombre} {vendedor.apellidos}" if vendedor else "Sin vendedor",
-                "rol": vendedor.rol if vendedor else "N/A"
-            },
-            "detalles": []
-        }
-        
-        
-        detalles = db.query(DetalleVenta).filter(DetalleVenta.venta_id == venta.id).all()
-        
-        for detalle in detalles:
-            producto = db.query(Producto).filter(Producto.id == detalle.producto_id).first()
-            
-            detalle_data = {
-                "id": detalle.id,
-                "producto": {
-                    "id": producto.id if producto else None,
-                    "nombre": producto.nombre if producto else "Producto no encontrado"
-                },
-                "cantidad": detalle.cantidad,
-                "precio_unitario": float(detalle.precio_unitario),
-                "total": float(detalle.cantidad * detalle.precio_unitario)
-            }
-            venta_data["detalles"].append(detalle_data)
-        
-        return venta_data
+        return _venta_a_dict(venta)
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error en obtener_venta: {e}")
         raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
@@ -0,0 +1,22 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from ..database import get_db
+from ..models.usuario import Usuario
+from ..routes.auth import get_current_user
+from ..utils import contadores
+
+router = APIRouter(
+    prefix="/stats",
+    tags=["Estadísticas"]
+)
+
+
+@router.get("/counts", response_model=dict)
+def obtener_conteos(db: Session = Depends(get_db), current_user: Usuario = Depends(get_current_user)):
+    """Conteos de productos, proveedores, clientes y usuarios (activos/inactivos)"""
+    conteos = contadores.obtener(db)
+    if current_user.rol != "administrador":
+        conteos.pop("usuarios")
+    for valores in conteos.values():
+        valores["total"] = valores["activos"] + valores["inactivos"]
+    return conteos
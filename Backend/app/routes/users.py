@@ -4,7 +4,8 @@ from typing import List
 from ..database import get_db
 from ..models.usuario import Usuario
 from ..schemas.usuario_schema import UsuarioCreate, UsuarioOut, UsuarioUpdate
-from ..routes.auth import get_current_user, hash_password, verify_password
+from ..routes.auth import get_current_user, hash_password, verify_password, invalidar_usuario
+from ..utils import contadores, versiones
 
 router = APIRouter(
     prefix="/users",
@@ -63,6 +64,8 @@ def create_usuario(usuario: UsuarioCreate, db: Session = Depends(get_db), curren
     db.add(db_usuario)
     db.commit()
     db.refresh(db_usuario)
+    contadores.registrar_alta("usuarios", db_usuario.is_active)
+    versiones.incrementar("usuarios")
     return db_usuario
 
 @router.put("/{user_id}", response_model=UsuarioOut)
@@ -96,11 +99,16 @@ def update_usuario(
     if "contraseña" in update_data:
         update_data["contraseña"] = hash_password(update_data["contraseña"])
     
+    estaba_activo = db_usuario.is_active is not False
     for field, value in update_data.items():
         setattr(db_usuario, field, value)
     
     db.commit()
     db.refresh(db_usuario)
+    invalidar_usuario(db_usuario.id)
+    versiones.incrementar("usuarios")
+    if (db_usuario.is_active is not False) != estaba_activo:
+        contadores.registrar_cambio_estado("usuarios", db_usuario.is_active is not False)
     return db_usuario
 
 @router.delete("/{user_id}")
@@ -120,8 +128,12 @@ def delete_usuario(user_id: int, db: Session = Depends(get_db), current_user: Us
             detail="No puedes eliminar tu propia cuenta"
         )
     
+    estaba_activo = db_usuario.is_active
     db.delete(db_usuario)
     db.commit()
+    invalidar_usuario(user_id)
+    contadores.registrar_baja("usuarios", estaba_activo)
+    versiones.incrementar("usuarios")
     return {"message": "Usuario eliminado correctamente"}
 
 @router.patch("/{user_id}/toggle-status", response_model=UsuarioOut)
@@ -144,6 +156,9 @@ def toggle_usuario_status(user_id: int, db: Session = Depends(get_db), current_u
     db_usuario.is_active = not db_usuario.is_active
     db.commit()
     db.refresh(db_usuario)
+    invalidar_usuario(db_usuario.id)
+    contadores.registrar_cambio_estado("usuarios", db_usuario.is_active)
+    versiones.incrementar("usuarios")
     return db_usuario
 
 @router.get("/buscar/{correo}", response_model=UsuarioOut)
@@ -1,11 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List
 
 class DetalleCompraCreate(BaseModel):
     producto_id: int
-    cantidad: int
+    cantidad: int = Field(gt=0)
     precio_unitario: float
 
 class CompraCreate(BaseModel):
     proveedor_id: int
-    productos: List[DetalleCompraCreate]
+    productos: List[DetalleCompraCreate] = Field(min_length=1)
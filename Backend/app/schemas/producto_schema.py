@@ -1,8 +1,9 @@
-from typing import List, Optional
-from pydantic import BaseModel
+from typing import Dict, List, Optional
+from pydantic import BaseModel, computed_field
 from datetime import datetime
 from .proveedores_schema import ProveedorOut
 from .tUnidad_schema import TUnidadOut
+from ..utils.imagenes import variantes_imagen
 
 class ProductoSchema(BaseModel):
     nombre: str
@@ -21,5 +22,10 @@ class ProductOut(ProductoSchema):
     tipo_unidad: Optional[TUnidadOut] = None  
     proveedores: List[ProveedorOut] = []
 
+    @computed_field
+    @property
+    def imagen_variantes(self) -> Dict[str, str]:
+        return variantes_imagen(self.imagen)
+
     class Config:
         from_attributes = True
@@ -1,16 +1,25 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
 
 class DetalleVentaCreate(BaseModel):
     producto_id: int
-    cantidad: int
+    cantidad: int = Field(gt=0)
     precio_unitario: float
 
 class VentaCreate(BaseModel):
     cliente_id: int
     vendedor_id: Optional[int] = None
-    detalles: List[DetalleVentaCreate]
+    detalles: List[DetalleVentaCreate] = Field(min_length=1)
+
+class VentaOfflineCreate(VentaCreate):
+    # Identificador generado por el cliente: al reenviar el lote no se duplica la venta
+    uuid_cliente: Optional[str] = Field(None, min_length=1, max_length=36)
+    # Momento real de la venta registrada sin conexión
+    fecha: Optional[datetime] = None
+
+class VentaBatchCreate(BaseModel):
+    ventas: List[VentaOfflineCreate] = Field(min_length=1)
 
 class DetalleVenta(BaseModel):
     id: int
@@ -24,6 +33,7 @@ class DetalleVenta(BaseModel):
 
 class VentaOut(BaseModel):
     id: int
+    orden_venta: Optional[str] = None
     cliente_id: int
     vendedor_id: Optional[int] = None
     fecha: datetime
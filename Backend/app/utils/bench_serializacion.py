@@ -0,0 +1,137 @@
+"""Benchmark de serialización de listados grandes (no necesita base de datos).
+
+Compara, para N productos y N ventas sintéticos, la vía normal (objetos ORM
+validados con pydantic / dicts anidados) con la vía rápida (proyecciones),
+ambas serializadas con orjson como RespuestaJSON, y el tamaño en la red sin
+comprimir, con gzip y con brotli:
+
+    python -m app.utils.bench_serializacion --filas 10000
+"""
+import argparse
+import statistics
+import time
+from collections import namedtuple
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import List
+from pydantic import TypeAdapter
+# Todos los modelos, para que se resuelvan las relaciones entre mappers
+from ..models.clientes import Cliente
+from ..models.compra import Compra, DetalleCompra
+from ..models.productos import Producto
+from ..models.proveedores import Proveedor
+from ..models.tUnidad import TipoUnidad
+from ..models.usuario import Usuario
+from ..models.ventas import Venta, DetalleVenta
+from ..schemas.producto_schema import ProductOut
+from . import proyecciones
+from .respuestas import comprimir, serializar
+
+FilaProducto = namedtuple("FilaProducto", [
+    "id", "nombre", "descripcion", "precio_compra", "precio_venta", "stock", "imagen",
+    "fechaIngreso", "unidad_id", "unidad_nombre",
+])
+FilaProveedor = namedtuple("FilaProveedor", [
+    "producto_id", "id", "nombre", "direccion", "telefono", "correo", "documento", "tipoDocumento",
+])
+FilaVenta = namedtuple("FilaVenta", [
+    "id", "orden_venta", "fecha", "cliente_id", "cliente_nombre", "cliente_documento",
+    "vendedor_id", "vendedor_nombre", "vendedor_apellidos", "vendedor_rol",
+])
+FilaDetalle = namedtuple("FilaDetalle", [
+    "padre_id", "id", "producto_id", "producto_nombre", "cantidad", "precio_unitario",
+])
+
+IMAGEN = "/images/" + "a" * 64 + ".jpg"
+
+
+def _medir(funcion, repeticiones: int):
+    tiempos = []
+    resultado = None
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        resultado = funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos) * 1000, resultado
+
+def _datos_productos(n: int):
+    unidad = TipoUnidad(id=1, nombre="Unidad")
+    proveedores = [
+        Proveedor(id=i, nombre=f"Proveedor {i}", direccion="Av. Principal 123", telefono="999888777",
+                  correo=f"proveedor{i}@correo.com", documento=f"20{i:09d}", tipoDocumento="RUC")
+        for i in range(1, 3)
+    ]
+    fecha = datetime(2024, 1, 1, 10, 30)
+    orm, filas, relaciones = [], [], []
+    for i in range(1, n + 1):
+        valores = dict(
+            id=i, nombre=f"Producto {i}", descripcion="Descripción del producto de prueba",
+            precio_compra=Decimal("12.50"), precio_venta=Decimal("19.90"), stock=i % 200,
+            imagen=IMAGEN, fechaIngreso=fecha,
+        )
+        orm.append(Producto(**valores, tipo_unidad=unidad, proveedores=proveedores))
+        filas.append(FilaProducto(**valores, unidad_id=unidad.id, unidad_nombre=unidad.nombre))
+        relaciones.extend(
+            FilaProveedor(i, p.id, p.nombre, p.direccion, p.telefono, p.correo, p.documento, p.tipoDocumento)
+            for p in proveedores
+        )
+    return orm, filas, relaciones
+
+def _datos_ventas(n: int, lineas: int = 3):
+    cliente = Cliente(id=1, nombre="Cliente de prueba", documento="12345678")
+    vendedor = Usuario(id=1, nombre="Ana", apellidos="Pérez", rol="vendedor")
+    producto = Producto(id=1, nombre="Producto 1")
+    inicio = datetime(2024, 1, 1)
+    orm, filas, detalles = [], [], []
+    for i in range(1, n + 1):
+        fecha = inicio + timedelta(minutes=i)
+        orden = f"{i:07d}"
+        lineas_venta = [
+            DetalleVenta(id=i * lineas + j, producto_id=1, producto=producto, cantidad=2, precio_unitario=Decimal("19.90"))
+            for j in range(lineas)
+        ]
+        orm.append(Venta(id=i, orden_venta=orden, fecha=fecha, cliente=cliente, vendedor=vendedor, detalles=lineas_venta))
+        filas.append(FilaVenta(i, orden, fecha, cliente.id, cliente.nombre, cliente.documento,
+                               vendedor.id, vendedor.nombre, vendedor.apellidos, vendedor.rol))
+        detalles.extend(
+            FilaDetalle(i, d.id, 1, producto.nombre, d.cantidad, d.precio_unitario) for d in lineas_venta
+        )
+    return orm, filas, detalles
+
+def _informe(nombre: str, ms: float, cuerpo: bytes):
+    tamanos = []
+    for codificacion in ("gzip", "br"):
+        ms_comp, comprimido = _medir(lambda: comprimir(cuerpo, codificacion), 3)
+        tamanos.append(f"{codificacion} {len(comprimido) / 1024:8.1f} KiB ({ms_comp:6.1f} ms)")
+    print(f"  {nombre:<10} {ms:8.1f} ms  {len(cuerpo) / 1024:8.1f} KiB  " + "  ".join(tamanos))
+
+def ejecutar(filas: int, repeticiones: int):
+    from ..routes.provedor_producto import _venta_a_dict
+
+    productos_orm, productos_filas, relaciones = _datos_productos(filas)
+    adaptador = TypeAdapter(List[ProductOut])
+
+    def productos_normal():
+        modelos = adaptador.validate_python(productos_orm, from_attributes=True)
+        return serializar(adaptador.dump_python(modelos, mode="json"))
+
+    def productos_rapido():
+        return serializar(proyecciones.productos_a_dicts(productos_filas, relaciones))
+
+    print(f"GET /productos/ ({filas} filas)")
+    _informe("normal", *_medir(productos_normal, repeticiones))
+    _informe("rapido", *_medir(productos_rapido, repeticiones))
+
+    ventas_orm, ventas_filas, detalles = _datos_ventas(filas)
+
+    print(f"GET /ventas/ ({filas} filas)")
+    _informe("normal", *_medir(lambda: serializar([_venta_a_dict(v) for v in ventas_orm]), repeticiones))
+    _informe("rapido", *_medir(lambda: serializar(proyecciones.ventas_a_dicts(ventas_filas, detalles)), repeticiones))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de serialización de listados")
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+    ejecutar(args.filas, args.repeticiones)
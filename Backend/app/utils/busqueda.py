@@ -0,0 +1,278 @@
+"""Búsqueda y autocompletado de productos, clientes y proveedores en memoria.
+
+El índice de trigramas guarda, por id, el texto normalizado (sin tildes ni mayúsculas)
+de los campos buscables y, por trigrama, los ids que lo contienen. Una
+consulta se parte en términos; los candidatos salen de intersectar los
+trigramas de cada término y se confirman con una búsqueda de subcadena. El
+orden se calcula con el peso del campo y el tipo de coincidencia (exacta,
+prefijo, inicio de palabra o subcadena).
+
+Para autocompletar por documento (DNI/RUC) o nombre, IndicePrefijos mantiene
+listas ordenadas de claves normalizadas y resuelve un prefijo con bisect.
+
+Los índices se construyen en la primera consulta, las rutas de escritura
+los actualizan con actualizar() y se reconstruyen en segundo plano cada
+BUSQUEDA_REFRESCO_SEG para recoger cambios hechos en otros workers.
+"""
+import bisect
+import os
+import threading
+import time
+import unicodedata
+from collections import defaultdict
+from sqlalchemy.orm import Session
+from ..database import ReadSessionLocal
+from ..models.clientes import Cliente
+from ..models.productos import Producto
+from ..models.proveedores import Proveedor
+
+BUSQUEDA_REFRESCO = float(os.getenv("BUSQUEDA_REFRESCO_SEG", "300"))
+N = 3
+
+
+def normalizar(texto) -> str:
+    """Minúsculas y sin tildes: 'Azúcar' -> 'azucar'"""
+    if not texto:
+        return ""
+    descompuesto = unicodedata.normalize("NFKD", str(texto))
+    return "".join(c for c in descompuesto if not unicodedata.combining(c)).casefold()
+
+def _ngramas(texto: str):
+    return {texto[i:i + N] for i in range(len(texto) - N + 1)}
+
+def _puntuar(campo: str, termino: str) -> float:
+    if campo == termino:
+        return 4
+    if campo.startswith(termino):
+        return 3
+    posicion = campo.find(termino)
+    if posicion < 0:
+        return 0
+    return 2 if not campo[posicion - 1].isalnum() else 1
+
+
+class _Indice:
+    """Construcción perezosa, refresco periódico y reindexado por fila.
+
+    Las subclases guardan todo su estado en un contenedor (_vacio) que se
+    arma aparte y se intercambia, así las búsquedas no esperan a la consulta.
+    Solo un hilo reconstruye a la vez; mientras tanto se sigue respondiendo
+    con el índice anterior y las filas que se actualizan durante la
+    construcción se vuelven a aplicar sobre el índice nuevo.
+    """
+
+    def __init__(self, modelo, columnas):
+        self.modelo = modelo
+        self.columnas = ["id", *columnas]
+        self._datos = self._vacio()
+        self._construido = 0.0
+        self._lock = threading.Lock()
+        self._lock_construccion = threading.Lock()
+        # id -> fila actualizada mientras hay una construcción en curso
+        self._pendientes = None
+
+    def _vacio(self):
+        raise NotImplementedError
+
+    def _agregar(self, datos, fila: dict):
+        raise NotImplementedError
+
+    def _quitar(self, datos, id: int):
+        raise NotImplementedError
+
+    def _finalizar(self, datos):
+        pass
+
+    def construir(self, db: Session):
+        """Reconstruye el índice completo desde la base de datos"""
+        with self._lock:
+            self._pendientes = {}
+        try:
+            datos = self._vacio()
+            consulta = db.query(*(getattr(self.modelo, columna) for columna in self.columnas))
+            for fila in consulta.yield_per(1000):
+                self._agregar(datos, dict(zip(self.columnas, fila)))
+            self._finalizar(datos)
+            with self._lock:
+                self._datos = datos
+                self._construido = time.monotonic()
+                # La consulta pudo leer una versión anterior de estas filas
+                for id, fila in self._pendientes.items():
+                    self._quitar(self._datos, id)
+                    self._agregar(self._datos, fila)
+        finally:
+            with self._lock:
+                self._pendientes = None
+
+    def vigente(self) -> bool:
+        return self._construido and time.monotonic() - self._construido < BUSQUEDA_REFRESCO
+
+    def _construir_con_sesion(self):
+        db = ReadSessionLocal()
+        try:
+            self.construir(db)
+        finally:
+            db.close()
+
+    def _refrescar(self):
+        try:
+            self._construir_con_sesion()
+        except Exception as e:
+            print(f"Error al refrescar el índice de {self.modelo.__tablename__}: {e}")
+        finally:
+            self._lock_construccion.release()
+
+    def asegurar(self):
+        """Construye el índice si no existe; si está vencido lo refresca en segundo plano"""
+        if self.vigente():
+            return
+        if self._construido:
+            # Se responde con el índice anterior; solo un hilo lo reconstruye
+            if self._lock_construccion.acquire(blocking=False):
+                threading.Thread(target=self._refrescar, daemon=True).start()
+            return
+        with self._lock_construccion:
+            if not self._construido:
+                self._construir_con_sesion()
+
+    def actualizar(self, obj):
+        """Reindexa un objeto tras crearlo o modificarlo"""
+        fila = {columna: getattr(obj, columna) for columna in self.columnas}
+        with self._lock:
+            if self._pendientes is not None:
+                self._pendientes[obj.id] = fila
+            if self._construido:
+                self._quitar(self._datos, obj.id)
+                self._agregar(self._datos, fila)
+
+
+class IndiceNgramas(_Indice):
+    def __init__(self, modelo, pesos: dict):
+        self.pesos = list(pesos.values())
+        super().__init__(modelo, pesos)
+
+    def _vacio(self):
+        # (id -> textos normalizados, trigrama -> ids)
+        return {}, defaultdict(set)
+
+    def _agregar(self, datos, fila: dict):
+        textos_por_id, ngramas = datos
+        textos = tuple(normalizar(fila[columna]) for columna in self.columnas[1:])
+        textos_por_id[fila["id"]] = textos
+        for texto in textos:
+            for ngrama in _ngramas(texto):
+                ngramas[ngrama].add(fila["id"])
+
+    def _quitar(self, datos, id: int):
+        textos_por_id, ngramas = datos
+        for texto in textos_por_id.pop(id, ()):
+            for ngrama in _ngramas(texto):
+                ids = ngramas.get(ngrama)
+                if ids is not None:
+                    ids.discard(id)
+                    if not ids:
+                        del ngramas[ngrama]
+
+    def buscar(self, consulta: str, limite: int) -> list:
+        """Ids ordenados por relevancia; todos los términos deben aparecer"""
+        terminos = normalizar(consulta).split()
+        if not terminos:
+            return []
+        with self._lock:
+            textos_por_id, ngramas = self._datos
+            candidatos = None
+            for termino in sorted(terminos, key=len, reverse=True):
+                if len(termino) < N:
+                    continue
+                ids = set.intersection(*(ngramas.get(g, set()) for g in _ngramas(termino)))
+                candidatos = ids if candidatos is None else candidatos & ids
+                if not candidatos:
+                    return []
+            if candidatos is None:
+                # Solo términos cortos: se recorre todo el índice
+                candidatos = textos_por_id.keys()
+
+            resultados = []
+            for id in candidatos:
+                textos = textos_por_id[id]
+                total = 0
+                for termino in terminos:
+                    puntos = max(_puntuar(texto, termino) * peso for texto, peso in zip(textos, self.pesos))
+                    if not puntos:
+                        break
+                    total += puntos
+                else:
+                    resultados.append((-total, textos[0], id))
+
+        resultados.sort()
+        return [id for _, _, id in resultados[:limite]]
+
+
+class IndicePrefijos(_Indice):
+    """Listas ordenadas (clave normalizada, id) por campo para autocompletar.
+
+    Guarda además la fila completa de cada id, así las sugerencias se
+    responden sin consultar la base de datos.
+    """
+
+    def __init__(self, modelo, campos, columnas):
+        self.campos = list(campos)
+        super().__init__(modelo, columnas)
+
+    def _vacio(self):
+        return {"filas": {}, **{campo: [] for campo in self.campos}}
+
+    def _agregar(self, datos, fila: dict):
+        datos["filas"][fila["id"]] = fila
+        for campo in self.campos:
+            clave = (normalizar(fila[campo]), fila["id"])
+            if datos is self._datos:
+                bisect.insort(datos[campo], clave)
+            else:
+                # Construcción completa: se ordena una sola vez en _finalizar
+                datos[campo].append(clave)
+
+    def _quitar(self, datos, id: int):
+        fila = datos["filas"].pop(id, None)
+        if fila is None:
+            return
+        for campo in self.campos:
+            lista = datos[campo]
+            posicion = bisect.bisect_left(lista, (normalizar(fila[campo]), id))
+            if posicion < len(lista) and lista[posicion][1] == id:
+                del lista[posicion]
+
+    def _finalizar(self, datos):
+        for campo in self.campos:
+            datos[campo].sort()
+
+    def sugerir(self, prefijo: str, limite: int, campo: str = None) -> list:
+        """Filas cuyo campo empieza por el prefijo, en orden alfabético"""
+        prefijo = normalizar(prefijo).strip()
+        if campo:
+            campos = [campo]
+        else:
+            # Sin prefijo se listan los primeros por el último campo (el nombre)
+            campos = self.campos if prefijo else self.campos[-1:]
+        resultados, vistos = [], set()
+        with self._lock:
+            for campo in campos:
+                lista = self._datos[campo]
+                posicion = bisect.bisect_left(lista, (prefijo,))
+                while posicion < len(lista) and len(resultados) < limite:
+                    clave, id = lista[posicion]
+                    if not clave.startswith(prefijo):
+                        break
+                    if id not in vistos:
+                        vistos.add(id)
+                        resultados.append(self._datos["filas"][id])
+                    posicion += 1
+        return resultados
+
+
+productos = IndiceNgramas(Producto, {"nombre": 3, "descripcion": 1})
+clientes = IndiceNgramas(Cliente, {"nombre": 3, "documento": 3})
+
+_COLUMNAS_CONTACTO = ["nombre", "documento", "tipoDocumento", "correo", "telefono", "direccion"]
+sugerencias_clientes = IndicePrefijos(Cliente, ["documento", "nombre"], _COLUMNAS_CONTACTO)
+sugerencias_proveedores = IndicePrefijos(Proveedor, ["documento", "nombre"], _COLUMNAS_CONTACTO)
@@ -0,0 +1,109 @@
+"""Caché de lectura del catálogo y las listas de referencia.
+
+Las listas de productos, unidades, proveedores y clientes (y cada producto
+por id) se sirven desde memoria; las rutas de escritura las invalidan tras
+el commit. Las claves son tuplas cuyo primer elemento es el grupo:
+
+    ("productos",)       ("producto", 7)
+    ("tipo_unidad",)     ("proveedores",)     ("clientes",)
+
+invalidar(grupo) descarta de golpe todas las claves del grupo (sube su
+generación) e invalidar_claves(...) solo las indicadas. Una carga que estaba
+en curso cuando se invalidó su clave no guarda el resultado, así que una
+lectura lenta nunca deja datos antiguos en la caché. El TTL acota el desfase
+entre workers, que no comparten memoria.
+
+Las rutas cacheadas cargan desde la base principal, no desde la réplica:
+tras una invalidación, una réplica con retraso devolvería la lista previa
+a la escritura y quedaría guardada (y marcada con el ETag nuevo) durante
+todo el TTL. Los aciertos de caché no abren conexión, porque la sesión se
+conecta en la primera consulta.
+"""
+import os
+import threading
+from .cache import CacheTTL
+
+CATALOGO_CACHE_TTL = float(os.getenv("CATALOGO_CACHE_TTL_SEG", "300"))
+CATALOGO_CACHE_MAX = int(os.getenv("CATALOGO_CACHE_MAX", "2048"))
+
+_cache = CacheTTL(CATALOGO_CACHE_MAX, CATALOGO_CACHE_TTL)
+_lock = threading.Lock()
+_generaciones = {}
+# Cargas en curso por clave y claves invalidadas mientras se cargaban
+_en_curso = {}
+_sucias = set()
+
+
+def _leer(clave):
+    entrada = _cache.get(clave)
+    if entrada is None:
+        return None
+    generacion, valor = entrada
+    if generacion != _generaciones.get(clave[0], 0):
+        return None
+    return entrada
+
+def _iniciar_carga(clave) -> int:
+    with _lock:
+        _en_curso[clave] = _en_curso.get(clave, 0) + 1
+        return _generaciones.get(clave[0], 0)
+
+def _terminar_carga(clave, generacion: int, valor, guardar: bool):
+    with _lock:
+        restantes = _en_curso[clave] - 1
+        if restantes:
+            _en_curso[clave] = restantes
+        else:
+            del _en_curso[clave]
+        vigente = clave not in _sucias and generacion == _generaciones.get(clave[0], 0)
+        if not restantes:
+            _sucias.discard(clave)
+        if guardar and vigente:
+            _cache.set(clave, (generacion, valor))
+
+def obtener(clave, cargar):
+    """Devuelve el valor cacheado o lo calcula con cargar() y lo guarda"""
+    entrada = _leer(clave)
+    if entrada is not None:
+        return entrada[1]
+    generacion = _iniciar_carga(clave)
+    valor, guardar = None, False
+    try:
+        valor = cargar()
+        guardar = True
+        return valor
+    finally:
+        _terminar_carga(clave, generacion, valor, guardar)
+
+async def obtener_async(clave, cargar):
+    """Como obtener(), con cargar una corrutina (sesión asíncrona)"""
+    entrada = _leer(clave)
+    if entrada is not None:
+        return entrada[1]
+    generacion = _iniciar_carga(clave)
+    valor, guardar = None, False
+    try:
+        valor = await cargar()
+        guardar = True
+        return valor
+    finally:
+        _terminar_carga(clave, generacion, valor, guardar)
+
+def invalidar(*grupos: str):
+    """Invalida todas las claves de los grupos indicados"""
+    with _lock:
+        for grupo in grupos:
+            _generaciones[grupo] = _generaciones.get(grupo, 0) + 1
+
+def invalidar_claves(*claves):
+    """Invalida solo las claves indicadas"""
+    with _lock:
+        for clave in claves:
+            _cache.delete(clave)
+            if clave in _en_curso:
+                _sucias.add(clave)
+
+def invalidar_productos(ids):
+    """Invalida la lista de productos y el detalle de los ids indicados"""
+    invalidar("productos")
+    invalidar_claves(*(("producto", id) for id in ids))
@@ -0,0 +1,97 @@
+"""Contadores en memoria de entidades (activas/inactivas) para la barra lateral.
+
+Las rutas de escritura los ajustan después de cada commit y una tarea
+periódica los reconcilia contra la base de datos para corregir desvíos.
+"""
+import asyncio
+import os
+import threading
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.productos import Producto
+from ..models.proveedores import Proveedor
+from ..models.clientes import Cliente
+from ..models.usuario import Usuario
+
+MODELOS = {
+    "productos": Producto,
+    "proveedores": Proveedor,
+    "clientes": Cliente,
+    "usuarios": Usuario,
+}
+
+INTERVALO_RECONCILIACION = int(os.getenv("CONTADORES_RECONCILIAR_SEG", "300"))
+
+_lock = threading.Lock()
+_contadores = None
+
+
+def _contar(db: Session, modelo):
+    activos, inactivos = 0, 0
+    filas = db.query(modelo.is_active, func.count()).group_by(modelo.is_active).all()
+    for is_active, total in filas:
+        # is_active NULL se considera activo, igual que el default de la columna
+        if is_active is False or is_active == 0:
+            inactivos += total
+        else:
+            activos += total
+    return {"activos": activos, "inactivos": inactivos}
+
+def reconciliar(db: Session):
+    """Recalcula todos los contadores desde la base de datos"""
+    global _contadores
+    nuevos = {entidad: _contar(db, modelo) for entidad, modelo in MODELOS.items()}
+    with _lock:
+        _contadores = nuevos
+    return nuevos
+
+def obtener(db: Session):
+    """Devuelve una copia de los contadores, cargándolos la primera vez"""
+    if _contadores is None:
+        reconciliar(db)
+    with _lock:
+        return {entidad: dict(valores) for entidad, valores in _contadores.items()}
+
+def ajustar(entidad: str, activos: int = 0, inactivos: int = 0):
+    """Aplica un delta a los contadores de una entidad (no-op si aún no se cargaron)"""
+    with _lock:
+        if _contadores is None:
+            return
+        _contadores[entidad]["activos"] += activos
+        _contadores[entidad]["inactivos"] += inactivos
+
+def registrar_alta(entidad: str, is_active=True):
+    if is_active is False:
+        ajustar(entidad, inactivos=1)
+    else:
+        ajustar(entidad, activos=1)
+
+def registrar_baja(entidad: str, is_active=True):
+    if is_active is False:
+        ajustar(entidad, inactivos=-1)
+    else:
+        ajustar(entidad, activos=-1)
+
+def registrar_cambio_estado(entidad: str, is_active: bool):
+    """Mueve una fila entre activos/inactivos tras cambiar su estado a `is_active`"""
+    if is_active:
+        ajustar(entidad, activos=1, inactivos=-1)
+    else:
+        ajustar(entidad, activos=-1, inactivos=1)
+
+async def reconciliar_periodicamente():
+    """Tarea de fondo que reconcilia los contadores cada INTERVALO_RECONCILIACION segundos"""
+    while True:
+        await asyncio.sleep(INTERVALO_RECONCILIACION)
+        try:
+            await asyncio.to_thread(_reconciliar_con_sesion)
+        except Exception as e:
+            print(f"Error al reconciliar contadores: {e}")
+
+def _reconciliar_con_sesion():
+    db = SessionLocal()
+    try:
+        reconciliar(db)
+    finally:
+        db.close()
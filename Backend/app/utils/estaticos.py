@@ -0,0 +1,43 @@
+"""Servidor de /images con cabeceras de caché agresivas.
+
+Los archivos direccionados por contenido (`<sha256>.<ext>` y sus variantes)
+nunca cambian: se sirven con ETag fuerte derivado del nombre y
+`Cache-Control: immutable` de un año. El resto se revalida con ETag/304.
+No hay versiones precomprimidas: JPEG, PNG, WebP y GIF ya van comprimidos y
+Brotli/gzip no reducen su tamaño. Las peticiones Range las resuelve FileResponse.
+"""
+import mimetypes
+import os
+import re
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from .imagenes import VARIANTES
+
+CACHE_INMUTABLE = "public, max-age=31536000, immutable"
+CACHE_REVALIDAR = "no-cache"
+
+_CONTENIDO = re.compile(
+    r"^[0-9a-f]{64}(\.[a-z0-9]+|_(%s)\.webp)$" % "|".join(VARIANTES)
+)
+
+
+class ImagenesStaticFiles(StaticFiles):
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        nombre = os.path.basename(full_path)
+        inmutable = bool(_CONTENIDO.match(nombre))
+        media_type = mimetypes.guess_type(nombre)[0] or "application/octet-stream"
+
+        headers = {"Cache-Control": CACHE_INMUTABLE if inmutable else CACHE_REVALIDAR}
+        if inmutable:
+            # FileResponse solo calcula su ETag (mtime-tamaño) si no se le pasa uno
+            headers["ETag"] = f'"{nombre}"'
+
+        response = FileResponse(
+            full_path, status_code=status_code, headers=headers, media_type=media_type, stat_result=stat_result
+        )
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
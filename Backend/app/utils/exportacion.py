@@ -0,0 +1,104 @@
+"""Exportación en streaming (CSV / NDJSON) de ventas y compras a nivel de línea.
+
+Las filas se leen con un cursor del lado del servidor (yield_per, que
+implica stream_results) en particiones de EXPORT_LOTE filas y se escriben a
+la respuesta según llegan, así que la memoria no depende del rango de
+fechas. El generador abre su propia conexión a la réplica: la sesión de la
+petición ya está cerrada cuando empieza el streaming.
+"""
+import csv
+import io
+import os
+from datetime import date
+from typing import Optional
+from fastapi import HTTPException
+from fastapi.responses import StreamingResponse
+from sqlalchemy import func, select
+from ..database import replica_engine
+from ..models.clientes import Cliente
+from ..models.compra import Compra, DetalleCompra
+from ..models.productos import Producto
+from ..models.proveedores import Proveedor
+from ..models.usuario import Usuario
+from ..models.ventas import Venta, DetalleVenta
+from .respuestas import serializar
+
+EXPORT_LOTE = int(os.getenv("EXPORT_LOTE", "1000"))
+
+FORMATOS = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def ventas_select():
+    return (
+        select(
+            Venta.id.label("venta_id"), Venta.orden_venta, Venta.fecha,
+            Venta.cliente_id, Cliente.documento.label("cliente_documento"), Cliente.nombre.label("cliente_nombre"),
+            Venta.vendedor_id, func.concat_ws(" ", Usuario.nombre, Usuario.apellidos).label("vendedor"),
+            DetalleVenta.producto_id, Producto.nombre.label("producto"),
+            DetalleVenta.cantidad, DetalleVenta.precio_unitario, DetalleVenta.total,
+        )
+        .join(DetalleVenta, DetalleVenta.venta_id == Venta.id)
+        .outerjoin(Cliente, Cliente.id == Venta.cliente_id)
+        .outerjoin(Usuario, Usuario.id == Venta.vendedor_id)
+        .outerjoin(Producto, Producto.id == DetalleVenta.producto_id)
+        .order_by(Venta.fecha, Venta.id, DetalleVenta.id)
+    )
+
+def compras_select():
+    return (
+        select(
+            Compra.id.label("compra_id"), Compra.orden_compra, Compra.fecha,
+            Compra.proveedor_id, Proveedor.documento.label("proveedor_documento"),
+            Proveedor.nombre.label("proveedor_nombre"),
+            DetalleCompra.producto_id, Producto.nombre.label("producto"),
+            DetalleCompra.cantidad, DetalleCompra.precio_unitario, DetalleCompra.total,
+        )
+        .join(DetalleCompra, DetalleCompra.compra_id == Compra.id)
+        .outerjoin(Proveedor, Proveedor.id == Compra.proveedor_id)
+        .outerjoin(Producto, Producto.id == DetalleCompra.producto_id)
+        .order_by(Compra.fecha, Compra.id, DetalleCompra.id)
+    )
+
+def _particiones(stmt):
+    with replica_engine.connect() as conn:
+        result = conn.execution_options(yield_per=EXPORT_LOTE).execute(stmt)
+        for particion in result.partitions():
+            yield particion
+
+def _csv(stmt, columnas):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM para que Excel detecte UTF-8
+    buffer.write("\ufeff")
+    writer.writerow(columnas)
+    yield buffer.getvalue().encode()
+
+    for particion in _particiones(stmt):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(
+            [valor.isoformat() if isinstance(valor, date) else valor for valor in fila]
+            for fila in particion
+        )
+        yield buffer.getvalue().encode()
+
+def _ndjson(stmt, columnas):
+    for particion in _particiones(stmt):
+        yield b"".join(serializar(dict(zip(columnas, fila))) + b"\n" for fila in particion)
+
+def exportar(stmt, nombre: str, formato: str, fecha_desde: Optional[date], fecha_hasta: Optional[date]):
+    """StreamingResponse con las filas de `stmt` en el formato pedido"""
+    if formato not in FORMATOS:
+        raise HTTPException(status_code=400, detail=f"Formato no soportado, use: {', '.join(FORMATOS)}")
+
+    columnas = list(stmt.selected_columns.keys())
+    generador = _csv(stmt, columnas) if formato == "csv" else _ndjson(stmt, columnas)
+    rango = f"_{fecha_desde or 'inicio'}_{fecha_hasta or 'hoy'}"
+    return StreamingResponse(
+        generador,
+        media_type=FORMATOS[formato],
+        headers={"Content-Disposition": f'attachment; filename="{nombre}{rango}.{formato}"'}
+    )
@@ -0,0 +1,90 @@
+"""Hash y verificación de contraseñas en un pool dedicado y acotado.
+
+bcrypt es deliberadamente lento; ejecutarlo en el threadpool de Starlette
+hace que una ráfaga de logins deje sin hilos al resto de endpoints. Aquí se
+ejecuta en un executor propio (hilos o procesos, HASH_POOL_TIPO) de
+HASH_POOL_WORKERS workers; el trabajo espera en cola como mucho
+HASH_TIMEOUT_SEG segundos antes de responder 503.
+"""
+import asyncio
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, TimeoutError
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+HASH_POOL_TIPO = os.getenv("HASH_POOL_TIPO", "thread")
+HASH_POOL_WORKERS = int(os.getenv("HASH_POOL_WORKERS", "2"))
+HASH_TIMEOUT = float(os.getenv("HASH_TIMEOUT_SEG", "10"))
+
+# Los hashes con otro coste se marcan como obsoletos y se rehacen al iniciar sesión
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+_executor = None
+_lock = threading.Lock()
+
+
+def _hashear(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verificar(password: str, hashed: str) -> bool:
+    return pwd_context.verify(password, hashed)
+
+def _verificar_y_actualizar(password: str, hashed: str):
+    return pwd_context.verify_and_update(password, hashed)
+
+def _pool():
+    global _executor
+    with _lock:
+        if _executor is None:
+            if HASH_POOL_TIPO == "process":
+                _executor = ProcessPoolExecutor(max_workers=HASH_POOL_WORKERS)
+            else:
+                _executor = ThreadPoolExecutor(max_workers=HASH_POOL_WORKERS, thread_name_prefix="bcrypt")
+        return _executor
+
+def _ocupado():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Servicio de autenticación ocupado, intente de nuevo"
+    )
+
+async def _ejecutar(funcion, *args):
+    future = _pool().submit(funcion, *args)
+    try:
+        return await asyncio.wait_for(asyncio.wrap_future(future), timeout=HASH_TIMEOUT)
+    except asyncio.TimeoutError:
+        future.cancel()
+        raise _ocupado()
+
+def _ejecutar_sync(funcion, *args):
+    future = _pool().submit(funcion, *args)
+    try:
+        return future.result(timeout=HASH_TIMEOUT)
+    except TimeoutError:
+        future.cancel()
+        raise _ocupado()
+
+async def hashear(password: str) -> str:
+    """Hashea una contraseña sin ocupar el threadpool de Starlette"""
+    return await _ejecutar(_hashear, password)
+
+async def verificar_y_actualizar(password: str, hashed: str):
+    """Devuelve (válida, nuevo_hash); nuevo_hash no es None si el coste cambió"""
+    return await _ejecutar(_verificar_y_actualizar, password, hashed)
+
+def hashear_sync(password: str) -> str:
+    """Versión bloqueante para endpoints síncronos poco frecuentes"""
+    return _ejecutar_sync(_hashear, password)
+
+def verificar_sync(password: str, hashed: str) -> bool:
+    return _ejecutar_sync(_verificar, password, hashed)
+
+def cerrar():
+    """Detiene el pool (al apagar la aplicación)"""
+    global _executor
+    with _lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
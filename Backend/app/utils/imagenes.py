@@ -0,0 +1,307 @@
+"""Almacenamiento de imágenes de productos direccionado por contenido.
+
+La subida se copia a disco por bloques en el threadpool (nunca en el event
+loop) con un tamaño máximo mientras se calcula su SHA-256; el archivo se
+guarda como `<sha256>.<formato>`, así que subir la misma foto dos veces
+reutiliza el mismo archivo. Luego se generan variantes WebP redimensionadas
+que los listados usan en lugar del original.
+
+Las referencias se cuentan sobre Producto.imagen: cuando un producto deja de
+usar una imagen y nadie más la referencia se borra, y la recolección de
+basura elimina cualquier archivo huérfano. Ninguno de los dos borra archivos
+subidos o reutilizados en los últimos IMAGEN_GRACIA_SEG segundos:
+
+    python -m app.utils.imagenes gc
+    python -m app.utils.imagenes variantes   # también se ejecuta al arrancar
+"""
+import argparse
+import hashlib
+import os
+import time
+import uuid
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Optional
+from fastapi import HTTPException, UploadFile
+from fastapi.concurrency import run_in_threadpool
+from PIL import Image, ImageOps
+from sqlalchemy import func, or_
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.productos import Producto
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+IMAGES_DIR = BASE_DIR / "images"
+IMAGES_DIR.mkdir(exist_ok=True)
+
+MAX_IMAGEN_BYTES = int(os.getenv("MAX_IMAGEN_BYTES", str(10 * 1024 * 1024)))
+TAMANO_BLOQUE = 64 * 1024
+PREFIJO_TEMPORAL = "tmp-"
+# Los temporales más antiguos que esto se consideran restos de subidas fallidas
+EDAD_TEMPORAL_SEG = 3600
+# Un archivo subido o reutilizado hace menos de esto no se borra aunque no
+# tenga referencias: el producto que lo va a usar puede no haber hecho commit
+GRACIA_IMAGEN_SEG = int(os.getenv("IMAGEN_GRACIA_SEG", "3600"))
+
+# Nombre de la variante -> lado mayor en píxeles
+VARIANTES = {
+    "thumb": 160,
+    "medium": 480,
+    "large": 1024,
+}
+
+EXTENSIONES = {"JPEG": "jpg", "PNG": "png", "WEBP": "webp", "GIF": "gif"}
+
+# Derivados que no forman parte de ninguna imagen (ver _nombre_base)
+SUFIJOS_DERIVADOS = (".br", ".gz")
+
+# Archivos cuyas referencias se comprueban con cada consulta de la recolección
+GC_LOTE = 500
+
+
+def _copiar_por_bloques(origen, destino: Path) -> str:
+    """Copia `origen` a `destino` y devuelve el SHA-256 del contenido"""
+    total = 0
+    sha = hashlib.sha256()
+    origen.seek(0)
+    with open(destino, "wb") as f:
+        while True:
+            bloque = origen.read(TAMANO_BLOQUE)
+            if not bloque:
+                break
+            total += len(bloque)
+            if total > MAX_IMAGEN_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"La imagen supera el tamaño máximo de {MAX_IMAGEN_BYTES // (1024 * 1024)} MB"
+                )
+            sha.update(bloque)
+            f.write(bloque)
+    return sha.hexdigest()
+
+def _nombre_variante(nombre: str, variante: str) -> str:
+    return f"{Path(nombre).stem}_{variante}.webp"
+
+def _nombre_base(nombre: str) -> Optional[str]:
+    """Nombre (sin extensión) del original al que pertenece un archivo.
+
+    Una imagen son su original y sus variantes. Cualquier otro derivado, como
+    un `x.jpg.br` precomprimido (nada los genera ni los sirve), no pertenece a
+    ninguna: devuelve None y tanto la recolección como eliminar_imagen lo borran.
+    """
+    if Path(nombre).suffix in SUFIJOS_DERIVADOS:
+        return None
+    for variante in VARIANTES:
+        sufijo = f"_{variante}.webp"
+        if nombre.endswith(sufijo):
+            return nombre[:-len(sufijo)]
+    return Path(nombre).stem
+
+def _propios(nombre: str):
+    """Original y variantes de una imagen"""
+    return [nombre] + [_nombre_variante(nombre, v) for v in VARIANTES]
+
+def _archivos(nombre: str):
+    """Archivos que se borran con una imagen: los propios y los derivados sueltos"""
+    propios = _propios(nombre)
+    return propios + [f"{propio}{sufijo}" for propio in propios for sufijo in SUFIJOS_DERIVADOS]
+
+def _extension(ruta: Path) -> str:
+    try:
+        with Image.open(ruta) as img:
+            return EXTENSIONES.get(img.format, (img.format or "bin").lower())
+    except (OSError, Image.DecompressionBombError):
+        raise HTTPException(status_code=400, detail="El archivo debe ser una imagen")
+
+def _generar_variantes(original: Path):
+    try:
+        with Image.open(original) as img:
+            img = ImageOps.exif_transpose(img)
+            if img.mode not in ("RGB", "RGBA"):
+                img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+            for variante, lado in VARIANTES.items():
+                copia = img.copy()
+                copia.thumbnail((lado, lado))
+                # Se escribe aparte y se renombra: nunca se sirve una variante a medias
+                temporal = IMAGES_DIR / f"{PREFIJO_TEMPORAL}{uuid.uuid4()}"
+                try:
+                    copia.save(temporal, "WEBP", quality=80, method=4)
+                    os.replace(temporal, IMAGES_DIR / _nombre_variante(original.name, variante))
+                finally:
+                    temporal.unlink(missing_ok=True)
+    except (OSError, Image.DecompressionBombError):
+        raise HTTPException(status_code=400, detail="El archivo debe ser una imagen")
+    _con_variantes.add(original.name)
+
+# Originales cuyas variantes ya se comprobaron en disco
+_con_variantes = set()
+
+def _variantes_completas(nombre: str) -> bool:
+    if nombre in _con_variantes:
+        return True
+    if all((IMAGES_DIR / _nombre_variante(nombre, v)).exists() for v in VARIANTES):
+        _con_variantes.add(nombre)
+        return True
+    return False
+
+def _guardar(origen) -> str:
+    temporal = IMAGES_DIR / f"{PREFIJO_TEMPORAL}{uuid.uuid4()}"
+    try:
+        digest = _copiar_por_bloques(origen, temporal)
+        nombre = f"{digest}.{_extension(temporal)}"
+        destino = IMAGES_DIR / nombre
+        if destino.exists():
+            temporal.unlink()
+            # Reutilizado: se renueva la fecha (también de las variantes) para
+            # que entre en el periodo de gracia
+            for archivo in _propios(nombre):
+                try:
+                    os.utime(IMAGES_DIR / archivo)
+                except FileNotFoundError:
+                    pass
+        else:
+            os.replace(temporal, destino)
+        if not _variantes_completas(nombre):
+            _generar_variantes(destino)
+    finally:
+        temporal.unlink(missing_ok=True)
+    return f"/images/{nombre}"
+
+async def guardar_imagen(imagen: UploadFile) -> str:
+    """Guarda la imagen subida y sus variantes; devuelve la URL del original"""
+    if not imagen.content_type or not imagen.content_type.startswith("image/"):
+        raise HTTPException(status_code=400, detail="El archivo debe ser una imagen")
+
+    try:
+        return await run_in_threadpool(_guardar, imagen.file)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error al guardar la imagen: {e}")
+
+def eliminar_imagen(url: str):
+    """Borra el original, sus variantes y sus derivados (ignora archivos inexistentes)"""
+    nombre = Path(url).name
+    _con_variantes.discard(nombre)
+    for archivo in _archivos(nombre):
+        (IMAGES_DIR / archivo).unlink(missing_ok=True)
+
+def variantes_imagen(url: Optional[str]) -> Dict[str, str]:
+    """URLs de las variantes redimensionadas, solo si existen en disco.
+
+    Las imágenes anteriores a las variantes no las tienen hasta que
+    generar_variantes_faltantes() (lanzada al arrancar) las crea; mientras
+    tanto se devuelve {} y el cliente usa el original.
+    """
+    if not url:
+        return {}
+    nombre = Path(url).name
+    if not _variantes_completas(nombre):
+        return {}
+    return {variante: f"/images/{_nombre_variante(nombre, variante)}" for variante in VARIANTES}
+
+def _reciente(ruta: Path) -> bool:
+    try:
+        return time.time() - ruta.stat().st_mtime < GRACIA_IMAGEN_SEG
+    except FileNotFoundError:
+        return False
+
+def liberar_imagen(db: Session, url: Optional[str]):
+    """Borra una imagen si ya ningún producto la referencia.
+
+    Si se subió o reutilizó hace poco se deja para la recolección de basura:
+    otra petición puede estar a punto de guardar un producto que la usa.
+    """
+    if not url:
+        return
+    referencias = db.query(func.count()).select_from(Producto).filter(Producto.imagen == url).scalar()
+    if referencias == 0 and not _reciente(IMAGES_DIR / Path(url).name):
+        eliminar_imagen(url)
+
+def _referenciadas(db: Session, bases) -> set:
+    """Cuáles de los nombres base usa algún producto (una consulta por lote)"""
+    if not bases:
+        return set()
+    urls = db.query(Producto.imagen).filter(
+        or_(*(Producto.imagen.contains(f"{base}.", autoescape=True) for base in bases))
+    ).distinct()
+    # contains() puede traer de más (otro nombre que termina igual): se filtra aquí
+    return {_nombre_base(Path(url).name) for (url,) in urls} & set(bases)
+
+def recolectar_basura(db: Session, lote: int = GC_LOTE):
+    """Elimina los archivos que ningún producto referencia; devuelve (archivos, bytes).
+
+    Recorre el directorio sin cargarlo en memoria y comprueba las referencias
+    de cada lote de archivos con una consulta. Se conservan los archivos del
+    periodo de gracia (al reutilizar una imagen se renuevan también sus variantes).
+    """
+    ahora = time.time()
+    archivos, liberados = 0, 0
+
+    def borrar(ruta, tamano):
+        nonlocal archivos, liberados
+        try:
+            os.unlink(ruta)
+        except FileNotFoundError:
+            return
+        archivos += 1
+        liberados += tamano
+
+    with os.scandir(IMAGES_DIR) as entradas:
+        while True:
+            grupo = list(islice(entradas, lote))
+            if not grupo:
+                break
+            candidatos = []
+            for entrada in grupo:
+                if not entrada.is_file():
+                    continue
+                info = entrada.stat()
+                edad = ahora - info.st_mtime
+                if entrada.name.startswith(PREFIJO_TEMPORAL):
+                    if edad >= EDAD_TEMPORAL_SEG:
+                        borrar(entrada.path, info.st_size)
+                elif edad >= GRACIA_IMAGEN_SEG:
+                    candidatos.append((_nombre_base(entrada.name), entrada.path, info.st_size))
+
+            referenciadas = _referenciadas(db, {base for base, _, _ in candidatos if base})
+            for base, ruta, tamano in candidatos:
+                if base is None or base not in referenciadas:
+                    borrar(ruta, tamano)
+    return archivos, liberados
+
+def generar_variantes_faltantes():
+    """Genera las variantes de imágenes subidas antes de que existieran"""
+    sufijos = tuple(f"_{variante}.webp" for variante in VARIANTES)
+    with os.scandir(IMAGES_DIR) as entradas:
+        for entrada in entradas:
+            nombre = entrada.name
+            if not entrada.is_file() or _nombre_base(nombre) is None or nombre.endswith(sufijos) \
+                    or nombre.startswith(PREFIJO_TEMPORAL):
+                continue
+            if _variantes_completas(nombre):
+                continue
+            try:
+                _generar_variantes(Path(entrada.path))
+            except HTTPException:
+                print(f"❌ No se pudo procesar {nombre}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantenimiento del directorio de imágenes")
+    parser.add_argument("comando", choices=["gc", "variantes"])
+    args = parser.parse_args()
+
+    if args.comando == "variantes":
+        generar_variantes_faltantes()
+        print("✅ Variantes generadas")
+    else:
+        # Registrar el resto de modelos para que se resuelvan las relaciones
+        from ..models import proveedores, tUnidad, ventas, compra, clientes, usuario
+
+        db = SessionLocal()
+        try:
+            archivos, liberados = recolectar_basura(db)
+            print(f"✅ {archivos} archivos eliminados ({liberados / (1024 * 1024):.1f} MB)")
+        finally:
+            db.close()
@@ -0,0 +1,205 @@
+"""Métricas de la aplicación en formato de texto de Prometheus (/metrics).
+
+El registro es en memoria y por proceso: con varios workers, Prometheus
+debe consultar cada uno por separado. Los histogramas solo se actualizan
+desde el middleware, en el event loop, y no necesitan lock; los contadores
+usan uno porque los de negocio y los del pool llegan también desde el
+threadpool. El estado de los pools se lee al exponer.
+"""
+import bisect
+import os
+import threading
+import time
+from collections import defaultdict
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+BUCKETS = tuple(
+    float(b) for b in os.getenv(
+        "METRICAS_BUCKETS", "0.005,0.01,0.025,0.05,0.1,0.25,0.5,1,2.5,5,10"
+    ).split(",")
+)
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _numero(valor) -> str:
+    """Enteros sin decimales y flotantes con precisión completa (no `:g`, que redondea a 6 cifras)"""
+    valor = float(valor)
+    return str(int(valor)) if valor.is_integer() else repr(valor)
+
+def _etiquetas(nombres, valores) -> str:
+    if not nombres:
+        return ""
+    pares = ",".join(f'{nombre}="{_escapar(valor)}"' for nombre, valor in zip(nombres, valores))
+    return "{" + pares + "}"
+
+
+class Contador:
+    def __init__(self, nombre: str, ayuda: str, etiquetas=()):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, tuple(etiquetas)
+        self._valores = defaultdict(float)
+        if not self.etiquetas:
+            self._valores[()] = 0
+        self._lock = threading.Lock()
+
+    def inc(self, *valores, cantidad: float = 1):
+        with self._lock:
+            self._valores[valores] += cantidad
+
+    def exponer(self):
+        yield f"# HELP {self.nombre} {self.ayuda}"
+        yield f"# TYPE {self.nombre} counter"
+        with self._lock:
+            valores_actuales = sorted(self._valores.items())
+        for valores, total in valores_actuales:
+            yield f"{self.nombre}{_etiquetas(self.etiquetas, valores)} {_numero(total)}"
+
+
+class Histograma:
+    """Histograma acumulativo; solo se actualiza desde el event loop"""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas=(), buckets=BUCKETS):
+        self.nombre, self.ayuda, self.etiquetas = nombre, ayuda, tuple(etiquetas)
+        self.buckets = tuple(sorted(buckets))
+        # valores -> [conteo por bucket..., +Inf], suma
+        self._series = {}
+
+    def observar(self, valor: float, *valores):
+        serie = self._series.get(valores)
+        if serie is None:
+            serie = self._series[valores] = [[0] * (len(self.buckets) + 1), 0.0]
+        serie[0][bisect.bisect_left(self.buckets, valor)] += 1
+        serie[1] += valor
+
+    def exponer(self):
+        yield f"# HELP {self.nombre} {self.ayuda}"
+        yield f"# TYPE {self.nombre} histogram"
+        nombres = (*self.etiquetas, "le")
+        for valores, (conteos, suma) in sorted(self._series.items()):
+            acumulado = 0
+            for limite, conteo in zip((*self.buckets, "+Inf"), conteos):
+                acumulado += conteo
+                le = limite if limite == "+Inf" else _numero(limite)
+                yield f"{self.nombre}_bucket{_etiquetas(nombres, (*valores, le))} {acumulado}"
+            yield f"{self.nombre}_sum{_etiquetas(self.etiquetas, valores)} {_numero(suma)}"
+            yield f"{self.nombre}_count{_etiquetas(self.etiquetas, valores)} {acumulado}"
+
+
+peticiones = Contador("http_requests_total", "Peticiones HTTP atendidas", ("method", "route", "status"))
+latencia = Histograma("http_request_duration_seconds", "Duración de las peticiones HTTP", ("method", "route"))
+_en_curso = 0
+
+ventas_creadas = Contador("ventas_creadas_total", "Ventas registradas")
+rechazos_stock = Contador("rechazos_stock_total", "Ventas rechazadas por stock insuficiente (409)")
+intentos_login = Contador("login_intentos_total", "Intentos de inicio de sesión", ("resultado",))
+
+espera_pool = Contador("db_pool_wait_seconds_total", "Tiempo obteniendo una conexión del pool (incluye abrir conexiones nuevas)", ("pool",))
+checkouts_pool = Contador("db_pool_checkouts_total", "Conexiones entregadas por el pool", ("pool",))
+timeouts_pool = Contador("db_pool_timeouts_total", "Esperas del pool que agotaron pool_timeout", ("pool",))
+
+
+class _PoolMedido:
+    """Mide la espera en _do_get, el punto donde el pool bloquea si está agotado"""
+
+    def _do_get(self):
+        nombre = getattr(self, "logging_name", None) or "default"
+        inicio = time.perf_counter()
+        try:
+            conexion = super()._do_get()
+        except PoolTimeoutError:
+            timeouts_pool.inc(nombre)
+            raise
+        finally:
+            espera_pool.inc(nombre, cantidad=time.perf_counter() - inicio)
+        checkouts_pool.inc(nombre)
+        return conexion
+
+class QueuePoolMedido(_PoolMedido, QueuePool):
+    pass
+
+class AsyncQueuePoolMedido(_PoolMedido, AsyncAdaptedQueuePool):
+    pass
+
+
+_engines = {}
+
+def registrar_engines(**engines):
+    """Engines cuyo pool se expone (para los async, pasar .sync_engine)"""
+    vistos = {id(e) for e in _engines.values()}
+    for nombre, engine in engines.items():
+        if id(engine) not in vistos:
+            _engines[nombre] = engine
+            vistos.add(id(engine))
+
+def _pools():
+    gauges = {
+        "db_pool_size": "Tamaño configurado del pool",
+        "db_pool_checked_out": "Conexiones prestadas en este momento",
+        "db_pool_overflow": "Conexiones abiertas por encima de pool_size",
+    }
+    valores = {nombre: [] for nombre in gauges}
+    for nombre, engine in _engines.items():
+        pool = engine.pool
+        etiqueta = _etiquetas(("pool",), (nombre,))
+        valores["db_pool_size"].append(f"{etiqueta} {pool.size()}")
+        valores["db_pool_checked_out"].append(f"{etiqueta} {pool.checkedout()}")
+        valores["db_pool_overflow"].append(f"{etiqueta} {max(pool.overflow(), 0)}")
+    for nombre, ayuda in gauges.items():
+        yield f"# HELP {nombre} {ayuda}"
+        yield f"# TYPE {nombre} gauge"
+        for valor in valores[nombre]:
+            yield nombre + valor
+
+def exponer() -> str:
+    lineas = [
+        "# HELP http_requests_in_flight Peticiones HTTP en curso",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {_en_curso}",
+    ]
+    for metrica in (peticiones, latencia, ventas_creadas, rechazos_stock, intentos_login,
+                    espera_pool, checkouts_pool, timeouts_pool):
+        lineas.extend(metrica.exponer())
+    lineas.extend(_pools())
+    return "\n".join(lineas) + "\n"
+
+
+class MetricasMiddleware:
+    """Cuenta peticiones y latencia por ruta (la plantilla, no la URL concreta)"""
+
+    def __init__(self, app, rutas_estaticas=()):
+        self.app = app
+        # Rutas que pueden responderse antes del router (p. ej. los 304 de los listados)
+        self.rutas_estaticas = frozenset(rutas_estaticas)
+
+    async def __call__(self, scope, receive, send):
+        global _en_curso
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = 500
+        async def send_con_estado(message):
+            nonlocal estado
+            if message["type"] == "http.response.start":
+                estado = message["status"]
+            await send(message)
+
+        _en_curso += 1
+        inicio = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_con_estado)
+        finally:
+            _en_curso -= 1
+            duracion = time.perf_counter() - inicio
+            route = scope.get("route")
+            if route is not None:
+                ruta = route.path
+            elif scope["path"] in self.rutas_estaticas:
+                ruta = scope["path"]
+            else:
+                # Sin plantilla (404, archivos estáticos): no se usa la URL para no crear series sin límite
+                ruta = "sin_ruta"
+            peticiones.inc(scope["method"], ruta, estado)
+            latencia.observar(duracion, scope["method"], ruta)
@@ -0,0 +1,77 @@
+"""Migraciones versionadas del esquema.
+
+Cada archivo `Backend/migraciones/NNNN_descripcion.sql` se aplica una sola
+vez, en orden, y su versión queda registrada en `schema_migraciones`:
+
+    python -m app.utils.migraciones            # aplica las pendientes
+    python -m app.utils.migraciones --listar   # muestra el estado
+"""
+import argparse
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from ..database import engine
+
+MIGRACIONES_DIR = Path(__file__).resolve().parent.parent.parent / "migraciones"
+
+# Tabla, columna o índice ya existentes (p. ej. creados a mano desde el README)
+_YA_EXISTE = {1050, 1060, 1061}
+
+
+def _archivos():
+    return sorted(MIGRACIONES_DIR.glob("[0-9][0-9][0-9][0-9]_*.sql"))
+
+def _sentencias(sql: str):
+    sin_comentarios = "\n".join(
+        linea for linea in sql.splitlines() if not linea.strip().startswith("--")
+    )
+    return [sentencia.strip() for sentencia in sin_comentarios.split(";") if sentencia.strip()]
+
+def _aplicadas(conn) -> set:
+    conn.execute(text(
+        "CREATE TABLE IF NOT EXISTS schema_migraciones ("
+        " version varchar(100) NOT NULL PRIMARY KEY,"
+        " aplicada timestamp DEFAULT CURRENT_TIMESTAMP NOT NULL)"
+    ))
+    return {fila[0] for fila in conn.execute(text("SELECT version FROM schema_migraciones"))}
+
+def aplicar_pendientes():
+    """Aplica en orden las migraciones que aún no están registradas"""
+    with engine.begin() as conn:
+        aplicadas = _aplicadas(conn)
+
+    for archivo in _archivos():
+        version = archivo.stem
+        if version in aplicadas:
+            continue
+        # MySQL confirma cada DDL por separado: una migración a medias se
+        # puede volver a lanzar, lo ya creado se salta
+        with engine.connect() as conn:
+            for sentencia in _sentencias(archivo.read_text(encoding="utf-8")):
+                try:
+                    conn.execute(text(sentencia))
+                except DBAPIError as e:
+                    if e.orig.args[0] not in _YA_EXISTE:
+                        raise
+                    print(f"  ⚠️  {e.orig.args[1]}")
+            conn.execute(text("INSERT INTO schema_migraciones (version) VALUES (:v)"), {"v": version})
+            conn.commit()
+        print(f"✅ {version}")
+
+def listar():
+    with engine.begin() as conn:
+        aplicadas = _aplicadas(conn)
+    for archivo in _archivos():
+        estado = "aplicada " if archivo.stem in aplicadas else "pendiente"
+        print(f"{estado}  {archivo.stem}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Migraciones versionadas del esquema")
+    parser.add_argument("--listar", action="store_true", help="Muestra qué migraciones están aplicadas")
+    args = parser.parse_args()
+
+    if args.listar:
+        listar()
+    else:
+        aplicar_pendientes()
@@ -0,0 +1,63 @@
+import base64
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import and_, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+
+def codificar_cursor(fecha: datetime, id: int) -> str:
+    """Codifica la posición (fecha, id) de la última fila de una página.
+
+    La columna de fecha debe ser NOT NULL: el keyset no alcanza filas con
+    fecha NULL (ver migraciones/0003_fecha_no_nula.sql).
+    """
+    if fecha is None:
+        raise ValueError(f"Fila {id} sin fecha: la paginación por keyset requiere fecha NOT NULL")
+    raw = f"{fecha.isoformat()}|{id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decodificar_cursor(cursor: str):
+    """Decodifica un cursor generado por codificar_cursor"""
+    try:
+        fecha, id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(fecha), int(id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Cursor inválido")
+
+def _aplicar_keyset(query, columna_fecha, columna_id, cursor: str, limit: int):
+    # Query y Select comparten filter/order_by/limit
+    if cursor:
+        fecha, id = decodificar_cursor(cursor)
+        query = query.filter(or_(
+            columna_fecha < fecha,
+            and_(columna_fecha == fecha, columna_id < id)
+        ))
+    return query.order_by(columna_fecha.desc(), columna_id.desc()).limit(limit + 1)
+
+def _cortar_pagina(filas, columna_fecha, columna_id, limit: int):
+    next_cursor = None
+    if len(filas) > limit:
+        filas = filas[:limit]
+        ultima = filas[-1]
+        next_cursor = codificar_cursor(
+            getattr(ultima, columna_fecha.key), getattr(ultima, columna_id.key)
+        )
+    return filas, next_cursor
+
+def paginar_keyset(query, columna_fecha, columna_id, cursor: str, limit: int):
+    """Aplica paginación por keyset (fecha, id) descendente sobre una consulta.
+
+    Devuelve las filas de la página y el cursor de la siguiente (o None).
+    """
+    filas = _aplicar_keyset(query, columna_fecha, columna_id, cursor, limit).all()
+    return _cortar_pagina(filas, columna_fecha, columna_id, limit)
+
+async def paginar_keyset_async(db: AsyncSession, stmt, columna_fecha, columna_id, cursor: str, limit: int,
+                               escalares: bool = True):
+    """Igual que paginar_keyset, pero para un select() sobre una sesión asíncrona.
+
+    Con escalares=False devuelve las filas (Row) de una proyección de columnas.
+    """
+    result = await db.execute(_aplicar_keyset(stmt, columna_fecha, columna_id, cursor, limit))
+    filas = result.unique().scalars().all() if escalares else result.all()
+    return _cortar_pagina(filas, columna_fecha, columna_id, limit)
@@ -0,0 +1,143 @@
+"""Medición de consultas SQL por petición.
+
+Los eventos before/after_cursor_execute de cada engine suman, en la
+medición de la petición en curso (un ContextVar que el middleware abre y
+cierra), el número de sentencias, el tiempo en la base de datos y cuántas
+veces se repite cada forma de sentencia. La respuesta lleva el resultado en
+la cabecera Server-Timing, visible en la pestaña Network del navegador:
+
+    Server-Timing: db;dur=12.4;desc="8 consultas", n1;desc="1 repetidas"
+
+Una forma que se repite SQL_N1_UMBRAL veces o más dentro de la misma
+petición (una consulta por fila de un listado) se avisa por consola.
+
+Para las pruebas, afirmar_consultas() comprueba el máximo de consultas de
+una respuesta y contar_consultas() mide un bloque de código directamente
+(las cotas por ruta están en tests/test_consultas.py):
+
+    respuesta = client.get("/ventas/")
+    afirmar_consultas(respuesta, 2)
+
+    with contar_consultas(maximo=2) as medicion:
+        _venta_query(db).filter(Venta.id == venta_id).first()
+"""
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from sqlalchemy import event
+
+SQL_PERFIL = os.getenv("SQL_PERFIL", "true").lower() in ("1", "true", "yes")
+SQL_N1_UMBRAL = int(os.getenv("SQL_N1_UMBRAL", "5"))
+
+# Listas de parámetros de IN (...) y VALUES (...) de distinto largo cuentan como la misma forma
+_LISTA_PARAMETROS = re.compile(r"\((?:\s*%s\s*,)+\s*%s\s*\)")
+_SERVER_TIMING_DB = re.compile(r'db;dur=([\d.]+);desc="(\d+) consultas"')
+
+
+class Medicion:
+    __slots__ = ("consultas", "tiempo", "formas")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.formas = Counter()
+
+    def repetidas(self, umbral: int = None) -> dict:
+        """Formas de sentencia ejecutadas `umbral` veces o más"""
+        umbral = umbral or SQL_N1_UMBRAL
+        return {forma: veces for forma, veces in self.formas.items() if veces >= umbral}
+
+    def server_timing(self) -> str:
+        valor = f'db;dur={self.tiempo * 1000:.1f};desc="{self.consultas} consultas"'
+        repetidas = self.repetidas()
+        if repetidas:
+            valor += f', n1;desc="{len(repetidas)} repetidas"'
+        return valor
+
+
+_medicion: ContextVar = ContextVar("medicion_sql", default=None)
+
+
+def _forma(sentencia: str) -> str:
+    return _LISTA_PARAMETROS.sub("(%s)", " ".join(sentencia.split()))
+
+def _antes(conn, cursor, sentencia, parametros, context, executemany):
+    if _medicion.get() is not None:
+        conn.info.setdefault("perfil_inicio", []).append(time.perf_counter())
+
+def _despues(conn, cursor, sentencia, parametros, context, executemany):
+    medicion = _medicion.get()
+    if medicion is None:
+        return
+    inicios = conn.info.get("perfil_inicio")
+    if inicios:
+        medicion.tiempo += time.perf_counter() - inicios.pop()
+    medicion.consultas += 1
+    medicion.formas[_forma(sentencia)] += 1
+
+def instrumentar(*engines):
+    """Registra los eventos de medición (para engines async, pasar .sync_engine)"""
+    for engine in {id(e): e for e in engines}.values():
+        if not event.contains(engine, "before_cursor_execute", _antes):
+            event.listen(engine, "before_cursor_execute", _antes)
+            event.listen(engine, "after_cursor_execute", _despues)
+
+
+@contextmanager
+def contar_consultas(maximo: int = None):
+    """Mide las consultas del bloque; con `maximo`, falla si se supera"""
+    medicion = Medicion()
+    token = _medicion.set(medicion)
+    try:
+        yield medicion
+    finally:
+        _medicion.reset(token)
+    if maximo is not None:
+        assert medicion.consultas <= maximo, _detalle(medicion, maximo)
+
+def afirmar_consultas(respuesta, maximo: int):
+    """Falla si la respuesta (TestClient/httpx) hizo más de `maximo` consultas"""
+    coincidencia = _SERVER_TIMING_DB.search(respuesta.headers.get("server-timing", ""))
+    assert coincidencia, "La respuesta no tiene Server-Timing: ¿falta PerfilSQLMiddleware o SQL_PERFIL=false?"
+    consultas = int(coincidencia.group(2))
+    assert consultas <= maximo, f"{consultas} consultas, máximo {maximo} ({respuesta.request.method} {respuesta.request.url.path})"
+    return consultas
+
+def _detalle(medicion: Medicion, maximo: int) -> str:
+    lineas = [f"{medicion.consultas} consultas, máximo {maximo}"]
+    for forma, veces in medicion.formas.most_common(5):
+        lineas.append(f"  {veces}x {forma[:200]}")
+    return "\n".join(lineas)
+
+
+class PerfilSQLMiddleware:
+    """Mide las consultas de cada petición y añade la cabecera Server-Timing"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SQL_PERFIL:
+            await self.app(scope, receive, send)
+            return
+
+        medicion = Medicion()
+        token = _medicion.set(medicion)
+
+        async def send_con_timing(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", medicion.server_timing().encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_con_timing)
+        finally:
+            _medicion.reset(token)
+
+        for forma, veces in medicion.repetidas().items():
+            print(f"⚠️  Posible N+1 en {scope['method']} {scope['path']}: {veces}x {forma[:200]}")
@@ -0,0 +1,91 @@
+"""Comprobación de planes de ejecución de las consultas críticas.
+
+Ejecuta EXPLAIN sobre las consultas de listados, filtros y búsquedas que
+dependen de los índices de `migraciones/0001_indices_rendimiento.sql` y
+termina con código 1 si alguna recorre una tabla completa (type=ALL) o un
+índice completo sin LIMIT que lo corte (type=index sin filtro usable). La
+prueba tests/test_planes.py ejecuta la misma comprobación en pytest; también
+puede lanzarse a mano contra una base con datos representativos:
+
+    python -m app.utils.planes
+    python -m app.utils.planes --min-filas 0   # estricto, incluso con pocas filas
+
+Con pocas filas MySQL prefiere a veces el recorrido completo aunque exista
+el índice; por eso los recorridos sobre tablas con menos de --min-filas filas
+estimadas solo se informan como aviso (la prueba usa 0 por defecto).
+"""
+import argparse
+import sys
+from datetime import datetime, timedelta
+from sqlalchemy import func, select
+from ..database import engine
+from ..models.clientes import Cliente
+from ..models.compra import Compra
+from ..models.productos import Producto
+from ..models.proveedores import Proveedor
+from ..models.ventas import Venta
+
+PAGINA = 51
+
+# Agregados que por naturaleza leen el índice entero (solo el índice, sin tocar filas)
+INDICE_COMPLETO_ESPERADO = {"productos: conteo por estado"}
+
+
+def consultas():
+    """(nombre, sentencia) de cada consulta a comprobar"""
+    hasta = datetime.now()
+    desde = hasta - timedelta(days=30)
+    return [
+        ("ventas: primera página", select(Venta.id).order_by(Venta.fecha.desc(), Venta.id.desc()).limit(PAGINA)),
+        ("ventas: página siguiente (keyset)", select(Venta.id).where(
+            (Venta.fecha < hasta) | ((Venta.fecha == hasta) & (Venta.id < 1000))
+        ).order_by(Venta.fecha.desc(), Venta.id.desc()).limit(PAGINA)),
+        ("ventas: rango de fechas", select(Venta.id).where(Venta.fecha >= desde, Venta.fecha < hasta)),
+        ("ventas: por vendedor", select(Venta.id).where(Venta.vendedor_id == 1)),
+        ("compras: primera página", select(Compra.id).order_by(Compra.fecha.desc(), Compra.id.desc()).limit(PAGINA)),
+        ("compras: rango de fechas", select(Compra.id).where(Compra.fecha >= desde, Compra.fecha < hasta)),
+        ("productos: prefijo de nombre", select(Producto.id).where(Producto.nombre.startswith("a"))),
+        ("productos: conteo por estado", select(Producto.is_active, func.count()).group_by(Producto.is_active)),
+        ("clientes: por documento", select(Cliente.id).where(Cliente.documento == "12345678")),
+        ("clientes: prefijo de documento", select(Cliente.id).where(Cliente.documento.startswith("123"))),
+        ("proveedores: por documento", select(Proveedor.id).where(Proveedor.documento == "20123456789")),
+    ]
+
+def explicar(conn, sentencia):
+    """Filas de EXPLAIN como diccionarios"""
+    compilada = sentencia.compile(dialect=engine.dialect)
+    result = conn.exec_driver_sql(f"EXPLAIN {compilada}", compilada.params)
+    return [dict(fila._mapping) for fila in result]
+
+def _recorrido_completo(nombre: str, sentencia, tipo: str) -> bool:
+    if tipo == "ALL":
+        return True
+    # type=index recorre el índice entero salvo que un LIMIT corte la lectura ordenada
+    return tipo == "index" and sentencia._limit_clause is None and nombre not in INDICE_COMPLETO_ESPERADO
+
+def comprobar(min_filas: int) -> list:
+    """Devuelve los errores (consultas con recorrido completo) e imprime el detalle"""
+    errores = []
+    with engine.connect() as conn:
+        for nombre, sentencia in consultas():
+            for fila in explicar(conn, sentencia):
+                tabla, tipo, clave, filas = fila.get("table"), fila.get("type"), fila.get("key"), fila.get("rows") or 0
+                if not _recorrido_completo(nombre, sentencia, tipo):
+                    print(f"✅ {nombre}: {tabla} type={tipo} key={clave}")
+                elif filas < min_filas:
+                    print(f"⚠️  {nombre}: {tabla} type={tipo} con ~{filas} filas (por debajo de {min_filas})")
+                else:
+                    print(f"❌ {nombre}: {tabla} type={tipo} key={clave} (~{filas} filas)")
+                    errores.append(nombre)
+    return errores
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Comprueba que las consultas críticas usan índices")
+    parser.add_argument("--min-filas", type=int, default=1000)
+    args = parser.parse_args()
+
+    errores = comprobar(args.min_filas)
+    if errores:
+        print(f"\n{len(errores)} consultas recorren tablas completas")
+        sys.exit(1)
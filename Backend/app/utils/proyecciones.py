@@ -0,0 +1,178 @@
+"""Proyecciones SQL para la vía rápida de los listados (?rapido=true).
+
+En lugar de cargar objetos ORM con sus relaciones y validarlos fila a fila
+con pydantic, se seleccionan solo las columnas necesarias y se arman
+directamente los diccionarios que devuelve cada listado, con la misma
+forma que la respuesta normal. RespuestaJSON los serializa con orjson.
+"""
+from collections import defaultdict
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.clientes import Cliente
+from ..models.compra import Compra, DetalleCompra
+from ..models.productos import Producto
+from ..models.proveedores import Proveedor, proveedor_producto
+from ..models.tUnidad import TipoUnidad
+from ..models.usuario import Usuario
+from ..models.ventas import Venta, DetalleVenta
+from .imagenes import variantes_imagen
+
+
+def _float(valor):
+    return float(valor) if valor is not None else None
+
+##################################PRODUCTOS##################################
+
+def productos_select():
+    return (
+        select(
+            Producto.id, Producto.nombre, Producto.descripcion, Producto.precio_compra,
+            Producto.precio_venta, Producto.stock, Producto.imagen, Producto.fechaIngreso,
+            TipoUnidad.id.label("unidad_id"), TipoUnidad.nombre.label("unidad_nombre"),
+        )
+        .outerjoin(TipoUnidad, TipoUnidad.id == Producto.tUnidad)
+        .order_by(Producto.id)
+    )
+
+def proveedores_de_productos_select():
+    return (
+        select(
+            proveedor_producto.c.producto_id, Proveedor.id, Proveedor.nombre, Proveedor.direccion,
+            Proveedor.telefono, Proveedor.correo, Proveedor.documento, Proveedor.tipoDocumento,
+        )
+        .join(Proveedor, Proveedor.id == proveedor_producto.c.proveedor_id)
+    )
+
+def productos_a_dicts(filas, proveedores) -> list:
+    """Arma la lista de ProductOut a partir de las dos proyecciones"""
+    por_producto = defaultdict(list)
+    for p in proveedores:
+        por_producto[p.producto_id].append({
+            "nombre": p.nombre,
+            "direccion": p.direccion,
+            "telefono": p.telefono,
+            "correo": p.correo,
+            "documento": p.documento,
+            "tipoDocumento": p.tipoDocumento,
+            "id": p.id,
+        })
+    return [
+        {
+            "nombre": f.nombre,
+            "descripcion": f.descripcion,
+            "precio_compra": _float(f.precio_compra),
+            "precio_venta": _float(f.precio_venta),
+            "stock": f.stock,
+            "imagen": f.imagen,
+            "id": f.id,
+            "fechaIngreso": f.fechaIngreso,
+            "tipo_unidad": {"nombre": f.unidad_nombre, "id": f.unidad_id} if f.unidad_id is not None else None,
+            "proveedores": por_producto.get(f.id, []),
+            "imagen_variantes": variantes_imagen(f.imagen),
+        }
+        for f in filas
+    ]
+
+##################################DETALLES##################################
+
+def _detalles_select(modelo, columna_padre, ids):
+    return (
+        select(
+            columna_padre.label("padre_id"), modelo.id, modelo.producto_id,
+            Producto.nombre.label("producto_nombre"), modelo.cantidad, modelo.precio_unitario,
+        )
+        .outerjoin(Producto, Producto.id == modelo.producto_id)
+        .where(columna_padre.in_(ids))
+        .order_by(modelo.id)
+    )
+
+def _agrupar_detalles(detalles, sin_producto: str):
+    por_padre = defaultdict(list)
+    for d in detalles:
+        por_padre[d.padre_id].append({
+            "id": d.id,
+            "producto": {
+                "id": d.producto_id if d.producto_nombre is not None else None,
+                "nombre": d.producto_nombre if d.producto_nombre is not None else sin_producto,
+            },
+            "cantidad": d.cantidad,
+            "precio_unitario": float(d.precio_unitario),
+            # Sobre el Decimal, como la vía normal: 3 * 0.1 daría 0.30000000000000004
+            "total": float(d.cantidad * d.precio_unitario),
+        })
+    return por_padre
+
+##################################VENTAS##################################
+
+def ventas_select():
+    return (
+        select(
+            Venta.id, Venta.orden_venta, Venta.fecha,
+            Cliente.id.label("cliente_id"), Cliente.nombre.label("cliente_nombre"),
+            Cliente.documento.label("cliente_documento"),
+            Usuario.id.label("vendedor_id"), Usuario.nombre.label("vendedor_nombre"),
+            Usuario.apellidos.label("vendedor_apellidos"), Usuario.rol.label("vendedor_rol"),
+        )
+        .outerjoin(Cliente, Cliente.id == Venta.cliente_id)
+        .outerjoin(Usuario, Usuario.id == Venta.vendedor_id)
+    )
+
+def detalles_venta_select(ids):
+    return _detalles_select(DetalleVenta, DetalleVenta.venta_id, ids)
+
+def ventas_a_dicts(filas, detalles) -> list:
+    """Misma forma que _venta_a_dict en las rutas de ventas"""
+    por_venta = _agrupar_detalles(detalles, "Producto no encontrado")
+    return [
+        {
+            "id": f.id,
+            "orden_venta": f.orden_venta,
+            "fecha": f.fecha,
+            "cliente": {
+                "id": f.cliente_id,
+                "nombre": f.cliente_nombre if f.cliente_id is not None else "Sin cliente",
+                "documento": f.cliente_documento if f.cliente_id is not None else "N/A",
+            },
+            "vendedor": {
+                "id": f.vendedor_id,
+                "nombre": f"{f.vendedor_nombre} {f.vendedor_apellidos}" if f.vendedor_id is not None else "Sin vendedor",
+                "rol": f.vendedor_rol if f.vendedor_id is not None else "N/A",
+            },
+            "detalles": por_venta.get(f.id, []),
+        }
+        for f in filas
+    ]
+
+##################################COMPRAS##################################
+
+def compras_query(db: Session):
+    return (
+        db.query(
+            Compra.id, Compra.orden_compra, Compra.fecha,
+            Proveedor.id.label("proveedor_id"), Proveedor.nombre.label("proveedor_nombre"),
+            Proveedor.documento.label("proveedor_documento"),
+        )
+        .select_from(Compra)
+        .outerjoin(Proveedor, Proveedor.id == Compra.proveedor_id)
+    )
+
+def detalles_compra_select(ids):
+    return _detalles_select(DetalleCompra, DetalleCompra.compra_id, ids)
+
+def compras_a_dicts(filas, detalles) -> list:
+    """Misma forma que la respuesta normal de GET /compras/"""
+    por_compra = _agrupar_detalles(detalles, "N/A")
+    return [
+        {
+            "id": f.id,
+            "orden_compra": f.orden_compra,
+            "fecha": f.fecha,
+            "proveedor": {
+                "id": f.proveedor_id,
+                "nombre": f.proveedor_nombre if f.proveedor_id is not None else "N/A",
+                "documento": f.proveedor_documento if f.proveedor_id is not None else "N/A",
+            },
+            "detalles": por_compra.get(f.id, []),
+        }
+        for f in filas
+    ]
@@ -0,0 +1,81 @@
+"""Respuesta JSON por defecto de la API: orjson y compresión gzip/brotli.
+
+RespuestaJSON serializa con orjson y, si el cuerpo supera
+COMPRESION_MINIMA_BYTES y el cliente lo acepta, lo comprime con brotli o
+gzip. Los cuerpos grandes se comprimen en el threadpool para no bloquear el
+event loop. Es la default_response_class de la aplicación, así que también
+la usan las rutas que devuelven modelos pydantic.
+"""
+import gzip
+import os
+from decimal import Decimal
+import brotli
+import orjson
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from starlette.datastructures import Headers
+
+COMPRESION_MINIMA = int(os.getenv("COMPRESION_MINIMA_BYTES", "1024"))
+# Por encima de este tamaño la compresión se hace fuera del event loop
+COMPRESION_EN_HILO = 256 * 1024
+GZIP_NIVEL = 6
+BROTLI_CALIDAD = 4
+
+
+def _calidades(accept_encoding: str) -> dict:
+    """{codificación: q} de un Accept-Encoding; un q mal formado cuenta como 0"""
+    calidades = {}
+    for parte in accept_encoding.split(","):
+        codificacion, *parametros = parte.split(";")
+        codificacion = codificacion.strip().lower()
+        if not codificacion:
+            continue
+        q = 1.0
+        for parametro in parametros:
+            nombre, _, valor = parametro.partition("=")
+            if nombre.strip().lower() == "q":
+                try:
+                    q = float(valor)
+                except ValueError:
+                    q = 0.0
+        calidades[codificacion] = q
+    return calidades
+
+def acepta_codificacion(request_headers: Headers, codificacion: str) -> bool:
+    """Indica si Accept-Encoding admite la codificación (q > 0, directamente o por *)"""
+    calidades = _calidades(request_headers.get("accept-encoding", ""))
+    return calidades.get(codificacion, calidades.get("*", 0.0)) > 0
+
+def _default(obj):
+    if isinstance(obj, Decimal):
+        return float(obj)
+    raise TypeError
+
+def serializar(contenido) -> bytes:
+    return orjson.dumps(contenido, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+def comprimir(cuerpo: bytes, codificacion: str) -> bytes:
+    if codificacion == "br":
+        return brotli.compress(cuerpo, quality=BROTLI_CALIDAD)
+    return gzip.compress(cuerpo, compresslevel=GZIP_NIVEL)
+
+
+class RespuestaJSON(JSONResponse):
+    def render(self, content) -> bytes:
+        return serializar(content)
+
+    async def __call__(self, scope, receive, send):
+        if len(self.body) >= COMPRESION_MINIMA and "content-encoding" not in self.headers:
+            request_headers = Headers(scope=scope)
+            codificacion = next(
+                (c for c in ("br", "gzip") if acepta_codificacion(request_headers, c)), None
+            )
+            if codificacion:
+                if len(self.body) >= COMPRESION_EN_HILO:
+                    self.body = await run_in_threadpool(comprimir, self.body, codificacion)
+                else:
+                    self.body = comprimir(self.body, codificacion)
+                self.headers["content-encoding"] = codificacion
+                self.headers["content-length"] = str(len(self.body))
+            self.headers.append("vary", "Accept-Encoding")
+        await super().__call__(scope, receive, send)
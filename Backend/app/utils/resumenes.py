@@ -0,0 +1,204 @@
+"""Mantenimiento de las tablas de resumen diario de ventas y compras.
+
+Reconstrucción completa desde las tablas de detalle, sin dejar el resumen
+vacío mientras dura (requiere MySQL 8.0.13+ para RENAME TABLE bajo LOCK TABLES):
+
+    python -m app.utils.resumenes --lote 5000
+"""
+import argparse
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal, ROUND_HALF_UP
+from sqlalchemy import column, func, select, table, text
+from sqlalchemy.dialects.mysql import insert
+from sqlalchemy.orm import Session
+from ..database import SessionLocal
+from ..models.resumenes import ResumenVentaDiaria, ResumenCompraDiaria
+from ..models.ventas import Venta, DetalleVenta
+from ..models.compra import Compra, DetalleCompra
+
+CENTIMOS = Decimal("0.01")
+
+
+def _sumar(stmt, tabla):
+    return stmt.on_duplicate_key_update(
+        cantidad=tabla.c.cantidad + stmt.inserted.cantidad,
+        monto=tabla.c.monto + stmt.inserted.monto,
+    )
+
+def _sombra(modelo):
+    """Tabla que recibe la reconstrucción en curso (solo existe mientras dura)"""
+    original = modelo.__table__
+    return table(f"{original.name}_nueva", *(column(c.name) for c in original.c))
+
+def _existe(db: Session, nombre: str) -> bool:
+    return bool(db.execute(
+        text("SELECT COUNT(*) FROM information_schema.tables WHERE table_schema = DATABASE() AND table_name = :nombre"),
+        {"nombre": nombre},
+    ).scalar())
+
+def _acumular(db: Session, modelo, filas):
+    if not filas:
+        return
+    db.execute(_sumar(insert(modelo.__table__).values(filas), modelo.__table__))
+    # Después del upsert: si hay una reconstrucción en curso, la sombra se
+    # creó antes de su foto y esta fila no está en ella (ver _reconstruir)
+    sombra = _sombra(modelo)
+    if _existe(db, sombra.name):
+        db.execute(_sumar(insert(sombra).values(filas), sombra))
+
+def _total(cantidad: int, precio_unitario) -> Decimal:
+    """Igual que detalle_*.total: precio redondeado a DECIMAL(10, 2) por la cantidad"""
+    return cantidad * Decimal(str(precio_unitario)).quantize(CENTIMOS, ROUND_HALF_UP)
+
+def _agrupar_lineas(lineas):
+    acumulado = defaultdict(lambda: [0, Decimal("0")])
+    for linea in lineas:
+        fila = acumulado[linea.producto_id]
+        fila[0] += linea.cantidad
+        fila[1] += _total(linea.cantidad, linea.precio_unitario)
+    return acumulado
+
+def acumular_ventas(db: Session, ventas):
+    """Suma varias ventas (fecha, vendedor_id, lineas) al resumen diario con un solo upsert"""
+    acumulado = defaultdict(lambda: [0, Decimal("0")])
+    for fecha, vendedor_id, lineas in ventas:
+        for producto_id, (cantidad, monto) in _agrupar_lineas(lineas).items():
+            fila = acumulado[(fecha.date(), producto_id, vendedor_id or 0)]
+            fila[0] += cantidad
+            fila[1] += monto
+    _acumular(db, ResumenVentaDiaria, [
+        {
+            "fecha": fecha,
+            "producto_id": producto_id,
+            "vendedor_id": vendedor_id,
+            "cantidad": cantidad,
+            "monto": monto,
+        }
+        for (fecha, producto_id, vendedor_id), (cantidad, monto) in acumulado.items()
+    ])
+
+def acumular_venta(db: Session, fecha: datetime, vendedor_id, lineas):
+    """Suma las líneas de una venta al resumen diario (misma transacción que la venta)"""
+    acumular_ventas(db, [(fecha, vendedor_id, lineas)])
+
+def acumular_compra(db: Session, fecha: datetime, proveedor_id: int, lineas):
+    """Suma las líneas de una compra al resumen diario (misma transacción que la compra)"""
+    _acumular(db, ResumenCompraDiaria, [
+        {
+            "fecha": fecha.date(),
+            "producto_id": producto_id,
+            "proveedor_id": proveedor_id,
+            "cantidad": cantidad,
+            "monto": monto,
+        }
+        for producto_id, (cantidad, monto) in _agrupar_lineas(lineas).items()
+    ])
+
+def _seleccion(cabecera, detalle, fk_detalle, columna_clave, desde: int, hasta: int):
+    """Agregado diario de las cabeceras con id en (desde, hasta]"""
+    return (
+        select(
+            func.date(cabecera.fecha).label("fecha"),
+            detalle.producto_id,
+            columna_clave,
+            func.sum(detalle.cantidad).label("cantidad"),
+            func.sum(detalle.total).label("monto"),
+        )
+        .join_from(cabecera, detalle, fk_detalle == cabecera.id)
+        .where(cabecera.id > desde, cabecera.id <= hasta)
+        .group_by(func.date(cabecera.fecha), detalle.producto_id, columna_clave)
+    )
+
+def _reconstruir(db: Session, resumen, cabecera, detalle, fk_detalle, columna_clave, lote: int):
+    """Reconstruye un resumen en una tabla sombra y la intercambia con RENAME TABLE.
+
+    Los lectores siguen viendo el resumen actual hasta el intercambio. La
+    sombra aparece (con el resumen bloqueado, sin escrituras a medias) en el
+    mismo instante en que se toma una foto consistente de las cabeceras: lo
+    confirmado antes está en la foto y entra en la sombra al recorrer el
+    histórico; lo que escribe en el resumen después también se suma a la
+    sombra desde _acumular. Así ninguna venta se cuenta dos veces ni se
+    pierde, aunque su id sea antiguo y se confirmara tarde.
+    """
+    engine = db.get_bind()
+    original = resumen.__table__
+    sombra = _sombra(resumen)
+    nombre, nombre_construccion, nombre_vieja = original.name, f"{original.name}_construccion", f"{original.name}_vieja"
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(f"DROP TABLE IF EXISTS {sombra.name}, {nombre_construccion}, {nombre_vieja}")
+        conn.exec_driver_sql(f"CREATE TABLE {nombre_construccion} LIKE {nombre}")
+        # CREATE TABLE ... LIKE no copia las claves foráneas
+        for fk in original.foreign_key_constraints:
+            locales = ", ".join(c.name for c in fk.columns)
+            remotas = ", ".join(e.column.name for e in fk.elements)
+            conn.exec_driver_sql(
+                f"ALTER TABLE {nombre_construccion} ADD FOREIGN KEY ({locales}) "
+                f"REFERENCES {fk.referred_table.name} ({remotas})"
+            )
+
+    try:
+        with engine.connect().execution_options(isolation_level="REPEATABLE READ") as lectura:
+            # 1. Foto y sombra a la vez. LOCK TABLES espera a que confirmen las
+            # transacciones que ya escribieron en el resumen y frena las demás
+            # antes de su upsert: al soltarlo ya ven la sombra
+            with engine.connect() as bloqueo:
+                bloqueo.exec_driver_sql(f"LOCK TABLES {nombre} WRITE, {nombre_construccion} WRITE")
+                try:
+                    lectura.exec_driver_sql("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+                    bloqueo.exec_driver_sql(f"RENAME TABLE {nombre_construccion} TO {sombra.name}")
+                finally:
+                    bloqueo.exec_driver_sql("UNLOCK TABLES")
+
+            # 2. Histórico de la foto por lotes, una transacción de escritura por lote
+            maximo = lectura.execute(select(func.max(cabecera.id))).scalar() or 0
+            ultimo_id = 0
+            while ultimo_id < maximo:
+                hasta = min(ultimo_id + lote, maximo)
+                filas = lectura.execute(
+                    _seleccion(cabecera, detalle, fk_detalle, columna_clave, ultimo_id, hasta)
+                ).mappings().all()
+                if filas:
+                    with engine.begin() as conn:
+                        conn.execute(_sumar(insert(sombra).values([dict(f) for f in filas]), sombra))
+                ultimo_id = hasta
+            lectura.rollback()
+
+        # 3. Intercambio: RENAME espera a las transacciones que escriben en
+        # cualquiera de las dos tablas, que ya sumaron en ambas
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"RENAME TABLE {nombre} TO {nombre_vieja}, {sombra.name} TO {nombre}")
+            conn.exec_driver_sql(f"DROP TABLE {nombre_vieja}")
+    except Exception:
+        # Una sombra a medias no debe seguir recibiendo los upserts en curso
+        with engine.begin() as conn:
+            conn.exec_driver_sql(f"DROP TABLE IF EXISTS {sombra.name}, {nombre_construccion}")
+        raise
+
+def reconstruir_resumenes(db: Session, lote: int = 5000):
+    """Regenera ambos resúmenes desde ventas/compras en lotes de `lote` cabeceras"""
+    _reconstruir(
+        db, ResumenVentaDiaria, Venta, DetalleVenta, DetalleVenta.venta_id,
+        func.coalesce(Venta.vendedor_id, 0).label("vendedor_id"), lote,
+    )
+    _reconstruir(
+        db, ResumenCompraDiaria, Compra, DetalleCompra, DetalleCompra.compra_id,
+        Compra.proveedor_id, lote,
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconstruye los resúmenes diarios de ventas y compras")
+    parser.add_argument("--lote", type=int, default=5000, help="Cabeceras procesadas por transacción")
+    args = parser.parse_args()
+
+    # Registrar el resto de modelos para que se resuelvan las relaciones
+    from ..models import productos, proveedores, clientes, usuario, tUnidad
+
+    db = SessionLocal()
+    try:
+        reconstruir_resumenes(db, args.lote)
+        print("✅ Resúmenes reconstruidos")
+    finally:
+        db.close()
@@ -0,0 +1,87 @@
+"""Numeración de documentos (orden_venta, orden_compra) sin carreras.
+
+Cada tipo de documento tiene una fila en `secuencias` que se incrementa con
+un único UPDATE atómico en una transacción propia y corta, de modo que dos
+terminales nunca reciben el mismo número ni se bloquean durante la venta.
+Con SECUENCIA_BLOQUE > 1 cada proceso reserva bloques de números y los
+reparte en memoria (puede dejar huecos si el proceso se reinicia).
+"""
+import os
+import threading
+from sqlalchemy import Integer, cast, func, insert, literal, select, update
+from ..database import engine
+from ..models.secuencias import Secuencia
+from ..models.ventas import Venta
+from ..models.compra import Compra
+
+BLOQUE = max(1, int(os.getenv("SECUENCIA_BLOQUE", "1")))
+
+# Columna desde la que se siembra cada secuencia la primera vez
+COLUMNAS = {
+    "venta": Venta.orden_venta,
+    "compra": Compra.orden_compra,
+}
+
+_lock = threading.Lock()
+_bloques = {}
+
+
+def formatear(numero: int) -> str:
+    return f"{numero:07d}"
+
+def _sembrar(conn, nombre: str):
+    columna = COLUMNAS[nombre]
+    ultimo = select(literal(nombre), func.coalesce(func.max(cast(columna, Integer)), 0))
+    conn.execute(
+        insert(Secuencia).prefix_with("IGNORE").from_select(["nombre", "valor"], ultimo)
+    )
+
+def _reservar_en_bd(nombre: str, cantidad: int) -> int:
+    """Incrementa la secuencia en `cantidad` y devuelve el último número reservado"""
+    incremento = (
+        update(Secuencia)
+        .where(Secuencia.nombre == nombre)
+        .values(valor=func.last_insert_id(Secuencia.valor + cantidad))
+    )
+    with engine.begin() as conn:
+        if conn.execute(incremento).rowcount == 0:
+            _sembrar(conn, nombre)
+            conn.execute(incremento)
+        return conn.execute(select(func.last_insert_id())).scalar()
+
+def reservar(nombre: str, cantidad: int = 1) -> list:
+    """Reserva `cantidad` números consecutivos o del bloque local del proceso"""
+    numeros = []
+    with _lock:
+        siguiente, limite = _bloques.get(nombre, (1, 0))
+        while len(numeros) < cantidad:
+            if siguiente > limite:
+                pedir = max(BLOQUE, cantidad - len(numeros))
+                limite = _reservar_en_bd(nombre, pedir)
+                siguiente = limite - pedir + 1
+            numeros.append(siguiente)
+            siguiente += 1
+        _bloques[nombre] = (siguiente, limite)
+    return numeros
+
+def siguiente(nombre: str) -> str:
+    """Asigna el siguiente número de documento ya formateado"""
+    return formatear(reservar(nombre)[0])
+
+def vistazo(nombre: str) -> str:
+    """Estimación del próximo número, sin reservarlo.
+
+    Solo sirve de vista previa: otra terminal puede llevárselo antes y, con
+    SECUENCIA_BLOQUE > 1, cada worker reparte su propio bloque. El número
+    definitivo es el que devuelve la creación del documento.
+    """
+    with _lock:
+        siguiente, limite = _bloques.get(nombre, (1, 0))
+        if siguiente <= limite:
+            return formatear(siguiente)
+    with engine.begin() as conn:
+        valor = conn.execute(select(Secuencia.valor).where(Secuencia.nombre == nombre)).scalar()
+        if valor is None:
+            _sembrar(conn, nombre)
+            valor = conn.execute(select(Secuencia.valor).where(Secuencia.nombre == nombre)).scalar()
+    return formatear(valor + 1)
@@ -0,0 +1,79 @@
+from collections import defaultdict
+from fastapi import HTTPException
+from sqlalchemy import case, func
+from sqlalchemy.orm import Session
+from ..models.productos import Producto
+
+
+class _StockRechazado(Exception):
+    pass
+
+def agrupar_cantidades(lineas) -> dict:
+    """Suma las cantidades de las líneas por producto_id"""
+    cantidades = defaultdict(int)
+    for linea in lineas:
+        cantidades[linea.producto_id] += linea.cantidad
+    return dict(cantidades)
+
+def _productos_faltantes(db: Session, cantidades: dict):
+    encontrados = {
+        id for (id,) in db.query(Producto.id).filter(Producto.id.in_(cantidades)).all()
+    }
+    return [id for id in cantidades if id not in encontrados]
+
+def descontar_stock(db: Session, cantidades: dict):
+    """Descuenta el stock de todos los productos con un único UPDATE condicional.
+
+    Si algún producto no existe o no tiene stock suficiente no se modifica
+    nada y se lanza un HTTPException con el detalle de cada línea rechazada.
+    """
+    if not cantidades:
+        return
+    cantidad = case(cantidades, value=Producto.id)
+    try:
+        # El savepoint deshace los descuentos parciales si alguna línea falla
+        with db.begin_nested():
+            actualizados = (
+                db.query(Producto)
+                .filter(Producto.id.in_(cantidades), Producto.stock >= cantidad)
+                .update({Producto.stock: Producto.stock - cantidad}, synchronize_session=False)
+            )
+            if actualizados != len(cantidades):
+                raise _StockRechazado()
+        return
+    except _StockRechazado:
+        pass
+
+    faltantes = _productos_faltantes(db, cantidades)
+    if faltantes:
+        raise HTTPException(status_code=404, detail=f"Producto ID {faltantes[0]} no encontrado")
+
+    productos = db.query(Producto.id, Producto.nombre, Producto.stock).filter(Producto.id.in_(cantidades)).all()
+    rechazadas = [
+        {
+            "producto_id": id,
+            "nombre": nombre,
+            "solicitado": cantidades[id],
+            "disponible": stock or 0,
+        }
+        for id, nombre, stock in productos
+        if (stock or 0) < cantidades[id]
+    ]
+    raise HTTPException(
+        status_code=409,
+        detail={"message": "Stock insuficiente", "lineas": rechazadas},
+    )
+
+def sumar_stock(db: Session, cantidades: dict):
+    """Incrementa el stock de todos los productos con un único UPDATE"""
+    if not cantidades:
+        return
+    cantidad = case(cantidades, value=Producto.id)
+    actualizados = (
+        db.query(Producto)
+        .filter(Producto.id.in_(cantidades))
+        .update({Producto.stock: func.coalesce(Producto.stock, 0) + cantidad}, synchronize_session=False)
+    )
+    if actualizados != len(cantidades):
+        faltantes = _productos_faltantes(db, cantidades) or list(cantidades)
+        raise HTTPException(status_code=404, detail=f"Producto ID {faltantes[0]} no encontrado")
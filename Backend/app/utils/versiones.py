@@ -0,0 +1,128 @@
+"""Versiones por tabla y GET condicional (ETag / 304) para los listados.
+
+Cada ruta de escritura llama a incrementar(...) después del commit. El
+middleware calcula el ETag de un listado a partir de las versiones de las
+tablas que muestra y de los parámetros de la petición, antes de ejecutar la
+ruta: si coincide con If-None-Match responde 304 sin tocar el ORM.
+
+Las versiones viven en la tabla `versiones_tablas`, compartida por todos los
+workers: una escritura en uno cambia el ETag en los demás. Cada proceso
+reutiliza la última lectura durante VERSIONES_CACHE_SEG segundos para no
+consultar la base en cada GET. La ventana de ETAG_VENTANA_SEG segundos
+obliga además a revalidar periódicamente, por si alguien escribe fuera de la API.
+"""
+import hashlib
+import os
+import threading
+import time
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import select
+from sqlalchemy.dialects.mysql import insert
+from starlette.datastructures import Headers
+from ..database import engine
+from ..models.versiones import VersionTabla
+
+ETAG_VENTANA_SEG = int(os.getenv("ETAG_VENTANA_SEG", "60"))
+VERSIONES_CACHE_SEG = float(os.getenv("VERSIONES_CACHE_SEG", "1"))
+
+# Ruta del listado -> tablas cuyos datos incluye la respuesta
+LISTADOS = {
+    "/productos/": ("productos", "tipo_unidad", "proveedores"),
+    "/tipo-unidad/": ("tipo_unidad",),
+    "/proveedores/": ("proveedores",),
+    "/clientes/": ("clientes",),
+    "/ventas/": ("ventas", "clientes", "usuarios", "productos"),
+    "/compras/": ("compras", "proveedores", "productos"),
+}
+
+_lock = threading.Lock()
+_versiones = {}
+_leidas_en = None
+
+
+def incrementar(*tablas: str):
+    """Marca las tablas como modificadas en todos los workers (llamar después del commit)"""
+    global _leidas_en
+    stmt = insert(VersionTabla).values([{"tabla": tabla, "version": 1} for tabla in tablas])
+    try:
+        with engine.begin() as conn:
+            conn.execute(stmt.on_duplicate_key_update(version=VersionTabla.version + 1))
+    except Exception as e:
+        # Los datos ya están confirmados: el fallo solo retrasa el cambio de ETag hasta la ventana
+        print(f"Error al incrementar versiones {tablas}: {e}")
+    with _lock:
+        _leidas_en = None
+
+def _leer() -> dict:
+    with engine.connect() as conn:
+        return dict(conn.execute(select(VersionTabla.tabla, VersionTabla.version)).all())
+
+async def versiones_actuales() -> dict:
+    """Versiones de todas las tablas, leídas como mucho cada VERSIONES_CACHE_SEG segundos"""
+    global _versiones, _leidas_en
+    with _lock:
+        if _leidas_en is not None and time.monotonic() - _leidas_en < VERSIONES_CACHE_SEG:
+            return _versiones
+    inicio = time.monotonic()
+    versiones = await run_in_threadpool(_leer)
+    with _lock:
+        _versiones, _leidas_en = versiones, inicio
+    return versiones
+
+def calcular_etag(ruta: str, query_string: bytes, versiones: dict) -> str:
+    """ETag débil de un listado para las versiones dadas"""
+    tablas = LISTADOS[ruta]
+    partes = [ruta, query_string.decode("latin-1"), str(int(time.time() // ETAG_VENTANA_SEG))]
+    partes += [f"{tabla}={versiones.get(tabla, 0)}" for tabla in tablas]
+    digest = hashlib.blake2b("|".join(partes).encode(), digest_size=8).hexdigest()
+    return f'W/"{digest}"'
+
+def _coincide(if_none_match: str, etag: str) -> bool:
+    # La comparación de If-None-Match es débil: se ignora el prefijo W/
+    if if_none_match.strip() == "*":
+        return True
+    valor = etag.removeprefix("W/")
+    return any(candidato.strip().removeprefix("W/") == valor for candidato in if_none_match.split(","))
+
+
+class VersionesETagMiddleware:
+    """Responde 304 a los GET de listados cuyo ETag no ha cambiado"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD") or scope["path"] not in LISTADOS:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            versiones = await versiones_actuales()
+        except Exception as e:
+            # Sin versiones no hay ETag fiable: se atiende la petición sin caché
+            print(f"Error al leer versiones: {e}")
+            await self.app(scope, receive, send)
+            return
+
+        # Se calcula antes de ejecutar la ruta: si hay una escritura en medio,
+        # el ETag queda asociado a la versión anterior y se revalida después
+        etag = calcular_etag(scope["path"], scope.get("query_string", b""), versiones)
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        if if_none_match and _coincide(if_none_match, etag):
+            await send({
+                "type": "http.response.start",
+                "status": 304,
+                "headers": [(b"etag", etag.encode()), (b"cache-control", b"no-cache")],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        async def send_con_etag(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = list(message.get("headers", []))
+                headers.append((b"etag", etag.encode()))
+                headers.append((b"cache-control", b"no-cache"))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_con_etag)
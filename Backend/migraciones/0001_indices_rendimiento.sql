@@ -0,0 +1,29 @@
+-- Índices para los listados paginados, filtros por fecha/vendedor,
+-- búsqueda por nombre y autocompletado por documento.
+
+create index ix_ventas_fecha_id
+    on ventas (fecha, id);
+
+create index ix_ventas_vendedor_id
+    on ventas (vendedor_id);
+
+create index ix_compras_fecha_id
+    on compras (fecha, id);
+
+create index ix_productos_nombre
+    on productos (nombre);
+
+create index ix_productos_is_active
+    on productos (is_active);
+
+create index ix_clientes_documento
+    on clientes (documento);
+
+create index ix_clientes_nombre
+    on clientes (nombre);
+
+create index ix_proveedores_documento
+    on proveedores (documento);
+
+create index ix_proveedores_nombre
+    on proveedores (nombre);
@@ -0,0 +1,8 @@
+-- Identificador generado por el cliente para las ventas sin conexión:
+-- POST /ventas/batch no vuelve a insertar una venta ya recibida.
+
+alter table ventas
+    add column uuid_cliente varchar(36) null;
+
+create unique index ux_ventas_uuid_cliente
+    on ventas (uuid_cliente);
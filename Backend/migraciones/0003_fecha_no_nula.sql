@@ -0,0 +1,19 @@
+-- La paginación por keyset (fecha, id) no alcanza filas con fecha NULL:
+-- se rellenan con la fecha más antigua de la tabla (quedan al final de los
+-- listados) y la columna pasa a NOT NULL.
+
+update ventas v
+    join (select coalesce(min(fecha), current_timestamp) as fecha from ventas) m
+    set v.fecha = m.fecha
+    where v.fecha is null;
+
+alter table ventas
+    modify fecha timestamp default CURRENT_TIMESTAMP not null;
+
+update compras c
+    join (select coalesce(min(fecha), current_timestamp) as fecha from compras) m
+    set c.fecha = m.fecha
+    where c.fecha is null;
+
+alter table compras
+    modify fecha timestamp default CURRENT_TIMESTAMP not null;
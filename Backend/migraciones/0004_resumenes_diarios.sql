@@ -0,0 +1,28 @@
+-- Resúmenes diarios de ventas y compras (app/utils/resumenes.py). Tras crearlos
+-- en una base con datos: python -m app.utils.resumenes
+
+create table resumen_venta_diaria
+(
+    fecha       date                      not null,
+    producto_id int                       not null,
+    vendedor_id bigint unsigned default 0 not null,
+    cantidad    int            default 0  not null,
+    monto       decimal(14, 2) default 0  not null,
+    primary key (fecha, producto_id, vendedor_id),
+    constraint resumen_venta_diaria_ibfk_1
+        foreign key (producto_id) references productos (id)
+);
+
+create table resumen_compra_diaria
+(
+    fecha        date                     not null,
+    producto_id  int                      not null,
+    proveedor_id int                      not null,
+    cantidad     int            default 0 not null,
+    monto        decimal(14, 2) default 0 not null,
+    primary key (fecha, producto_id, proveedor_id),
+    constraint resumen_compra_diaria_ibfk_1
+        foreign key (producto_id) references productos (id),
+    constraint resumen_compra_diaria_ibfk_2
+        foreign key (proveedor_id) references proveedores (id)
+);
@@ -0,0 +1,9 @@
+-- Versiones por tabla compartidas por todos los workers: el ETag de los
+-- listados (app/utils/versiones.py) cambia en cuanto cualquiera escribe.
+
+create table versiones_tablas
+(
+    tabla   varchar(30)      not null
+        primary key,
+    version bigint default 0 not null
+);
@@ -0,0 +1,45 @@
+"""Fixtures de las pruebas que necesitan una base de datos MySQL real.
+
+Solo se ejecutan si TEST_DB_NAME apunta a una base de pruebas con el esquema
+aplicado (python -m app.utils.migraciones sobre el esquema del README). El
+host y las credenciales se toman de DB_HOST, DB_USER y DB_PASSWORD:
+
+    TEST_DB_NAME=adisan_test python -m pytest -q
+
+Sin TEST_DB_NAME, o si no hay conexión, las pruebas se omiten.
+"""
+import os
+import pytest
+
+TEST_DB_NAME = os.getenv("TEST_DB_NAME")
+if TEST_DB_NAME:
+    # Antes de importar app.database; load_dotenv no pisa variables ya definidas.
+    # Sin réplica: las pruebas no deben leer de otra base que la de pruebas
+    os.environ["DB_NAME"] = TEST_DB_NAME
+    os.environ["DB_REPLICA_URL"] = ""
+
+
+@pytest.fixture(scope="session")
+def engine():
+    if not TEST_DB_NAME:
+        pytest.skip("TEST_DB_NAME no configurada")
+    pytest.importorskip("fastapi")
+    pytest.importorskip("sqlalchemy")
+    from sqlalchemy import text
+    from sqlalchemy.exc import OperationalError
+    from app.database import engine
+
+    try:
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"No se pudo conectar a la base de pruebas: {e}")
+    return engine
+
+@pytest.fixture(scope="session")
+def client(engine):
+    from fastapi.testclient import TestClient
+    from app.main import app
+
+    with TestClient(app) as client:
+        yield client
@@ -0,0 +1,66 @@
+"""Cotas de consultas SQL por ruta: un N+1 nuevo hace fallar la prueba.
+
+Cada ruta se llama una vez para calentar conexiones, índices de búsqueda y
+la inicialización del dialecto; luego se vacía la caché del catálogo y se
+mide una segunda llamada con la cabecera Server-Timing (app/utils/perfil_sql.py).
+Las cotas no dependen del número de filas: con datos suficientes en la base
+de pruebas, una consulta por fila las supera.
+"""
+import pytest
+
+# Ruta -> máximo de consultas
+LISTADOS = {
+    "/productos/": 2,
+    "/productos/?rapido=true": 2,
+    "/productos/search?q=a": 2,
+    "/tipo-unidad/": 1,
+    "/proveedores/": 1,
+    "/proveedores/sugerencias?q=": 0,
+    "/clientes/": 1,
+    "/clientes/search?q=a": 1,
+    "/clientes/sugerencias?q=": 0,
+    "/ventas/?limit=100": 2,
+    "/ventas/?limit=100&rapido=true": 2,
+    "/compras/?limit=100": 2,
+    "/compras/?limit=100&rapido=true": 2,
+    "/dashboard/summary": 10,
+    "/dashboard/ventas-diarias": 1,
+    "/dashboard/compras-diarias": 1,
+}
+
+# Ruta de detalle -> (listado del que sale un id, máximo de consultas)
+DETALLES = {
+    "/productos/{id}": ("/productos/", 2),
+    "/proveedores/{id}": ("/proveedores/", 1),
+    "/clientes/{id}": ("/clientes/", 1),
+    "/ventas/{id}": ("/ventas/?limit=1", 2),
+    "/compras/{id}": ("/compras/?limit=1", 2),
+}
+
+
+def _medir(client, ruta: str, maximo: int):
+    from app.utils import catalogo
+    from app.utils.perfil_sql import afirmar_consultas
+
+    assert client.get(ruta).status_code == 200
+    catalogo.invalidar("productos", "producto", "tipo_unidad", "proveedores", "clientes")
+    respuesta = client.get(ruta)
+    assert respuesta.status_code == 200
+    afirmar_consultas(respuesta, maximo)
+
+def _primer_id(client, listado: str):
+    datos = client.get(listado).json()
+    filas = datos["items"] if isinstance(datos, dict) else datos
+    if not filas:
+        pytest.skip(f"{listado} no tiene filas en la base de pruebas")
+    return filas[0]["id"]
+
+
+@pytest.mark.parametrize("ruta", LISTADOS)
+def test_consultas_listados(client, ruta):
+    _medir(client, ruta, LISTADOS[ruta])
+
+@pytest.mark.parametrize("ruta", DETALLES)
+def test_consultas_detalles(client, ruta):
+    listado, maximo = DETALLES[ruta]
+    _medir(client, ruta.format(id=_primer_id(client, listado)), maximo)
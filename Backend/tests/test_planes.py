@@ -0,0 +1,17 @@
+"""Regresión de planes: las consultas críticas no deben recorrer tablas completas.
+
+Envuelve app/utils/planes.py en modo estricto: cualquier recorrido completo
+falla, aunque la base de pruebas tenga pocas filas. Con una base sin datos
+representativos, PLAN_MIN_FILAS permite rebajar esos casos a aviso
+(ver --min-filas en el CLI).
+"""
+import os
+
+PLAN_MIN_FILAS = int(os.getenv("PLAN_MIN_FILAS", "0"))
+
+
+def test_consultas_criticas_usan_indices(engine):
+    from app.utils import planes
+
+    errores = planes.comprobar(PLAN_MIN_FILAS)
+    assert not errores, f"Recorren tablas completas: {', '.join(errores)}"
@@ -0,0 +1,52 @@
+"""POST /ventas/batch: una venta inválida no rechaza las demás del lote y el
+reenvío del mismo lote no duplica ventas.
+
+Registra ventas reales (y descuenta stock) en la base de pruebas.
+"""
+import uuid
+import pytest
+
+
+def _venta(cliente_id: int, producto: dict, **extra):
+    return {
+        "cliente_id": cliente_id,
+        "uuid_cliente": str(uuid.uuid4()),
+        "detalles": [{"producto_id": producto["id"], "cantidad": 1, "precio_unitario": producto["precio_venta"] or 1}],
+        **extra,
+    }
+
+@pytest.fixture
+def datos(client):
+    clientes = client.get("/clientes/").json()
+    productos = [p for p in client.get("/productos/").json() if (p["stock"] or 0) >= 2]
+    if not clientes or not productos:
+        pytest.skip("La base de pruebas necesita un cliente y un producto con stock")
+    return clientes[0]["id"], productos[0], max(c["id"] for c in clientes) + 1_000_000
+
+
+def test_venta_invalida_no_rechaza_el_lote(client, datos):
+    cliente_id, producto, inexistente = datos
+    ventas = [
+        _venta(cliente_id, producto),
+        _venta(inexistente, producto),
+        _venta(cliente_id, producto, fecha="2024-01-15T10:30:00"),
+    ]
+
+    respuesta = client.post("/ventas/batch", json={"ventas": ventas})
+    assert respuesta.status_code == 200
+    resultados = respuesta.json()["resultados"]
+    assert [r["error"] is None for r in resultados] == [True, False, True]
+    assert "Cliente" in resultados[1]["error"]
+
+    venta = client.get(f"/ventas/{resultados[2]['id']}").json()
+    assert venta["fecha"].startswith("2024-01-15T10:30")
+
+def test_reenvio_no_duplica(client, datos):
+    cliente_id, producto, _ = datos
+    ventas = [_venta(cliente_id, producto)]
+
+    primera = client.post("/ventas/batch", json={"ventas": ventas}).json()
+    segunda = client.post("/ventas/batch", json={"ventas": ventas}).json()
+    assert primera["creadas"] == 1
+    assert segunda["creadas"] == 0 and segunda["duplicadas"] == 1
+    assert segunda["resultados"][0]["id"] == primera["resultados"][0]["id"]
@@ -62,53 +62,14 @@ export function AppSidebar({ ...props }: React.ComponentProps<typeof Sidebar>) {
       }
 
       try {
-        const [productsRes, providersRes, clienteRes, usersRes] = await Promise.all([
-          axios.get("http://127.0.0.1:8000/productos/", { headers: { Authorization: `Bearer ${token}` } }),
-          axios.get("http://127.0.0.1:8000/proveedores/", { headers: { Authorization: `Bearer ${token}` } }),
-          axios.get("http://127.0.0.1:8000/clientes/", { headers: { Authorization: `Bearer ${token}` } }),
-          axios.get("http://127.0.0.1:8000/users/", { headers: { Authorization: `Bearer ${token}` } }),
-        ])
-        setProductCount(productsRes.data.length)
-        setUserCount(usersRes.data.length)
-        setProviderCount(providersRes.data.length)
-        setClienteCount(clienteRes.data.length)
-        
-        console.log("Conteos obtenidos:", {
-          productos: productsRes.data.length,
-          usuarios: usersRes.data.length,
-          proveedores: providersRes.data.length,
-          clientes: clienteRes.data.length
-        })
+        const response = await axios.get("http://127.0.0.1:8000/stats/counts", { headers: { Authorization: `Bearer ${token}` } })
+        const counts = response.data
+        setProductCount(counts.productos.total)
+        setProviderCount(counts.proveedores.total)
+        setClienteCount(counts.clientes.total)
+        setUserCount(counts.usuarios?.total ?? 0)
       } catch (error) {
         console.error("Error al obtener los conteos:", error)
-
-        try {
-          const productsRes = await axios.get("http://127.0.0.1:8000/productos/", { headers: { Authorization: `Bearer ${token}` } })
-          setProductCount(productsRes.data.length)
-        } catch (e) {
-          console.error("Error obteniendo productos:", e)
-        }
-        
-        try {
-          const providersRes = await axios.get("http://127.0.0.1:8000/proveedores/", { headers: { Authorization: `Bearer ${token}` } })
-          setProviderCount(providersRes.data.length)
-        } catch (e) {
-          console.error("Error obteniendo proveedores:", e)
-        }
-        
-        try {
-          const clienteRes = await axios.get("http://127.0.0.1:8000/clientes/", { headers: { Authorization: `Bearer ${token}` } })
-          setClienteCount(clienteRes.data.length)
-        } catch (e) {
-          console.error("Error obteniendo clientes:", e)
-        }
-        
-        try {
-          const usersRes = await axios.get("http://127.0.0.1:8000/users/", { headers: { Authorization: `Bearer ${token}` } })
-          setUserCount(usersRes.data.length)
-        } catch (e) {
-          console.error("Error obteniendo usuarios:", e)
-        }
       }
     }
 
@@ -53,11 +53,12 @@ interface ProveedorComboboxProps {
 export function ProveedorCombobox({ value, onChange }: ProveedorComboboxProps) {
   const [open, setOpen] = React.useState(false)
   const [proveedores, setProveedores] = React.useState<Proveedor[]>([])
-  const [selectedId, setSelectedId] = React.useState<number | null>(null)
+  const [seleccionado, setSeleccionado] = React.useState<Proveedor | null>(null)
+  const [busqueda, setBusqueda] = React.useState("")
 
     React.useEffect(() => {
     if (value?.id) {
-      setSelectedId(value.id)
+      setSeleccionado(value)
     }
   }, [value])
   
@@ -77,18 +78,21 @@ export function ProveedorCombobox({ value, onChange }: ProveedorComboboxProps) {
     tipoDocumento: "RUC",
   })
 
-React.useEffect(() => {
-    const fetchProveedores = async () => {
+  // Sugerencias por prefijo de RUC/DNI o nombre; no se descarga la lista completa
+  React.useEffect(() => {
+    if (!open) return
+    const timeout = setTimeout(async () => {
       try {
-        const response = await axios.get(`${API_URL}/proveedores/`)
+        const response = await axios.get(`${API_URL}/proveedores/sugerencias`, {
+          params: { q: busqueda, limit: 20 },
+        })
         setProveedores(response.data)
       } catch (error) {
         console.error("Error fetching proveedores:", error)
       }
-    }
-
-    fetchProveedores()
-  }, [API_URL])
+    }, 150)
+    return () => clearTimeout(timeout)
+  }, [API_URL, busqueda, open])
 
 
   const handleChange = (e: React.ChangeEvent<HTMLInputElement>) => {
@@ -132,18 +136,17 @@ React.useEffect(() => {
           aria-expanded={open}
           className="w-[580px] justify-between"
         >
-          {selectedId
-            ? (() => {
-                const proveedor = proveedores.find(p => p.id === selectedId)
-                return proveedor ? proveedor.nombre : "Seleccione proveedor..."
-              })()
-            : "Seleccione proveedor..."}
+          {seleccionado ? seleccionado.nombre : "Seleccione proveedor..."}
           <ChevronsUpDownIcon className="ml-2 h-4 w-4 shrink-0 opacity-50" />
         </Button>
       </PopoverTrigger>
       <PopoverContent className="w-[580px] p-0">
-        <Command>
-          <CommandInput placeholder="Buscar proveedor..." />
+        <Command shouldFilter={false}>
+          <CommandInput
+            placeholder="Buscar por RUC o nombre..."
+            value={busqueda}
+            onValueChange={setBusqueda}
+          />
           <div className="max-h-72 overflow-y-auto">
             <CommandList>
               <CommandEmpty>No se encontró proveedor</CommandEmpty>
@@ -151,9 +154,9 @@ React.useEffect(() => {
                 {proveedores.map((proveedor) => (
                   <CommandItem
                     key={proveedor.id}
-                    value={`${proveedor.nombre} ${proveedor.documento}`.toLowerCase()}
+                    value={proveedor.id.toString()}
                     onSelect={() => {
-                      setSelectedId(proveedor.id)
+                      setSeleccionado(proveedor)
                       setOpen(false)
                       if (onChange) onChange(proveedor)
                     }}
@@ -161,7 +164,7 @@ React.useEffect(() => {
                     <CheckIcon
                       className={cn(
                         "mr-2 h-4 w-4",
-                        selectedId === proveedor.id ? "opacity-100" : "opacity-0"
+                        seleccionado?.id === proveedor.id ? "opacity-100" : "opacity-0"
                       )}
                     />
                     <div>
@@ -62,6 +62,7 @@ export default function DataTableDemo() {
   const [columnVisibility, setColumnVisibility] = React.useState<VisibilityState>({})
   const [rowSelection, setRowSelection] = React.useState({})
   const [globalFilter, setGlobalFilter] = React.useState("")
+  const [resultados, setResultados] = React.useState<Provider[]>([])
   
   const handleClienteCreado = (nuevo: Provider) => {
     setProviders((prev) => [...prev, nuevo])
@@ -157,31 +158,43 @@ export default function DataTableDemo() {
     fetchProviders()
   }, [])
 
+  // La búsqueda se resuelve en el servidor; se espera a que el usuario deje de escribir
+  React.useEffect(() => {
+    const termino = globalFilter.trim()
+    if (!termino) {
+      setResultados([])
+      return
+    }
+    const timeout = setTimeout(async () => {
+      try {
+        const response = await axios.get("http://127.0.0.1:8000/clientes/search", {
+          params: { q: termino, limit: 100 },
+        })
+        setResultados(response.data)
+      } catch (error) {
+        console.error("Error buscando clientes:", error)
+      }
+    }, 250)
+    return () => clearTimeout(timeout)
+  }, [globalFilter])
+
   const table = useReactTable({
-    data: providers,
+    data: globalFilter.trim() ? resultados : providers,
     columns,
     state: {
       sorting,
       columnFilters,
       columnVisibility,
       rowSelection,
-      globalFilter,
     },
     onSortingChange: setSorting,
     onColumnFiltersChange: setColumnFilters,
     onColumnVisibilityChange: setColumnVisibility,
     onRowSelectionChange: setRowSelection,
-    onGlobalFilterChange: setGlobalFilter,
     getCoreRowModel: getCoreRowModel(),
     getPaginationRowModel: getPaginationRowModel(),
     getSortedRowModel: getSortedRowModel(),
     getFilteredRowModel: getFilteredRowModel(),
-    globalFilterFn: (row, _, filterValue) => {
-      const nombre = row.original.nombre?.toLowerCase() || ""
-      const telefono = row.original.telefono?.toLowerCase() || ""
-      const val = filterValue.toLowerCase()
-      return nombre.includes(val) || telefono.includes(val)
-    },
   })
 
   if (loading) return <div className="p-4">Cargando Clientes...</div>
@@ -190,7 +203,7 @@ export default function DataTableDemo() {
    <div className="w-full">
     <div className="flex items-center py-4">
       <Input
-        placeholder="Buscar por nombre o teléfono..."
+        placeholder="Buscar por nombre o documento..."
         value={globalFilter}
         onChange={(e) => setGlobalFilter(e.target.value)}
         className="max-w-sm"
@@ -19,6 +19,7 @@ interface DashboardStats {
   totalProductos: number
   totalClientes: number
   totalProveedores: number
+  totalBajoStock: number
   ventasRecientes: any[]
   comprasRecientes: any[]
   productosBajoStock: any[]
@@ -33,6 +34,7 @@ export default function DashboardPanel() {
     totalProductos: 0,
     totalClientes: 0,
     totalProveedores: 0,
+    totalBajoStock: 0,
     ventasRecientes: [],
     comprasRecientes: [],
     productosBajoStock: [],
@@ -49,51 +51,22 @@ export default function DashboardPanel() {
         setLoading(true)
         
         
-        const [ventasRes, comprasRes, productosRes, clientesRes, proveedoresRes] = await Promise.all([
-          axios.get(`${import.meta.env.VITE_API_URL}/ventas/`),
-          axios.get(`${import.meta.env.VITE_API_URL}/compras/`),
-          axios.get(`${import.meta.env.VITE_API_URL}/productos/`),
-          axios.get(`${import.meta.env.VITE_API_URL}/clientes/`),
-          axios.get(`${import.meta.env.VITE_API_URL}/proveedores/`)
-        ])
-
-        const ventas = ventasRes.data || []
-        const compras = comprasRes.data || []
-        const productos = productosRes.data || []
-        const clientes = clientesRes.data || []
-        const proveedores = proveedoresRes.data || []
-
-        
-        const totalVentas = ventas.reduce((sum: number, venta: any) => {
-          return sum + (venta.detalles?.reduce((detSum: number, det: any) => detSum + det.total, 0) || 0)
-        }, 0)
-
-        const totalCompras = compras.reduce((sum: number, compra: any) => {
-          return sum + (compra.detalles?.reduce((detSum: number, det: any) => detSum + det.total, 0) || 0)
-        }, 0)
-
-        
-        const productosBajoStock = productos.filter((p: any) => p.stock < 10)
-
-        
-        const topProductos = productos
-          .sort((a: any, b: any) => b.stock - a.stock)
-          .slice(0, 5)
+        const response = await axios.get(`${import.meta.env.VITE_API_URL}/dashboard/summary`, {
+          params: { umbral_stock: 10, limite: 5 }
+        })
+        const resumen = response.data
 
         setStats({
-          totalVentas,
-          totalCompras,
-          totalProductos: productos.length,
-          totalClientes: clientes.length,
-          totalProveedores: proveedores.length,
-          ventasRecientes: ventas
-            .sort((a: any, b: any) => new Date(b.fecha).getTime() - new Date(a.fecha).getTime())
-            .slice(0, 5),
-          comprasRecientes: compras
-            .sort((a: any, b: any) => new Date(b.fecha).getTime() - new Date(a.fecha).getTime())
-            .slice(0, 5),
-          productosBajoStock,
-          topProductos
+          totalVentas: resumen.total_ventas,
+          totalCompras: resumen.total_compras,
+          totalProductos: resumen.total_productos,
+          totalClientes: resumen.total_clientes,
+          totalProveedores: resumen.total_proveedores,
+          totalBajoStock: resumen.total_bajo_stock,
+          ventasRecientes: resumen.ventas_recientes,
+          comprasRecientes: resumen.compras_recientes,
+          productosBajoStock: resumen.productos_bajo_stock,
+          topProductos: resumen.top_productos
         })
       } catch (error) {
         console.error("Error al cargar datos del dashboard:", error)
@@ -143,7 +116,7 @@ export default function DashboardPanel() {
     {
       title: "Productos",
       value: stats.totalProductos.toString(),
-      change: `${stats.productosBajoStock.length} bajo stock`,
+      change: `${stats.totalBajoStock} bajo stock`,
       icon: Package,
       color: "text-orange-600",
       bgColor: "bg-orange-50",
@@ -284,12 +257,12 @@ export default function DashboardPanel() {
                         </span>
                       </div>
                       <p className="text-xs text-muted-foreground">
-                        {venta.detalles?.length || 0} productos
+                        {venta.productos} productos
                       </p>
                     </div>
                     <div className="text-right">
                       <p className="text-sm font-medium">
-                        {formatCurrency(venta.detalles?.reduce((sum: number, det: any) => sum + det.total, 0) || 0)}
+                        {formatCurrency(venta.total)}
                       </p>
                       <p className="text-xs text-muted-foreground">
                         {formatDate(venta.fecha)}
@@ -329,12 +302,12 @@ export default function DashboardPanel() {
                           </span>
                         </div>
                         <p className="text-xs text-muted-foreground">
-                          {compra.detalles?.length || 0} productos
+                          {compra.productos} productos
                         </p>
                       </div>
                       <div className="text-right">
                         <p className="text-sm font-medium">
-                          {formatCurrency(compra.detalles?.reduce((sum: number, det: any) => sum + det.total, 0) || 0)}
+                          {formatCurrency(compra.total)}
                         </p>
                         <p className="text-xs text-muted-foreground">
                           {formatDate(compra.fecha)}
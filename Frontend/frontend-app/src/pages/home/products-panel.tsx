@@ -68,6 +68,7 @@ export default function DataTableDemo() {
   const [columnVisibility, setColumnVisibility] = React.useState<VisibilityState>({})
   const [rowSelection, setRowSelection] = React.useState({})
   const [globalFilter, setGlobalFilter] = React.useState("")
+  const [resultados, setResultados] = React.useState<Productos[]>([])
 
 
   const columns: ColumnDef<Productos>[] = [
@@ -180,31 +181,43 @@ export default function DataTableDemo() {
     fetchProducts()
   }, [])
 
+  // La búsqueda se resuelve en el servidor; se espera a que el usuario deje de escribir
+  React.useEffect(() => {
+    const termino = globalFilter.trim()
+    if (!termino) {
+      setResultados([])
+      return
+    }
+    const timeout = setTimeout(async () => {
+      try {
+        const response = await axios.get("http://127.0.0.1:8000/productos/search", {
+          params: { q: termino, limit: 100 },
+        })
+        setResultados(response.data)
+      } catch (error) {
+        console.error("Error buscando productos:", error)
+      }
+    }, 250)
+    return () => clearTimeout(timeout)
+  }, [globalFilter])
+
   const table = useReactTable({
-    data: productos,
+    data: globalFilter.trim() ? resultados : productos,
     columns,
     state: {
       sorting,
       columnFilters,
       columnVisibility,
       rowSelection,
-      globalFilter,
     },
     onSortingChange: setSorting,
     onColumnFiltersChange: setColumnFilters,
     onColumnVisibilityChange: setColumnVisibility,
     onRowSelectionChange: setRowSelection,
-    onGlobalFilterChange: setGlobalFilter,
     getCoreRowModel: getCoreRowModel(),
     getPaginationRowModel: getPaginationRowModel(),
     getSortedRowModel: getSortedRowModel(),
     getFilteredRowModel: getFilteredRowModel(),
-    globalFilterFn: (row, _, filterValue) => {
-      const nombre = row.original.nombre?.toLowerCase() ?? ""
-      const descripcion = row.original.descripcion?.toLowerCase() ?? ""
-      const term = filterValue.toLowerCase()
-      return nombre.includes(term) || descripcion.includes(term)
-    },
   })
 
   if (loading) return <div className="p-4">Cargando productos...</div>
@@ -214,7 +227,7 @@ export default function DataTableDemo() {
 
       <div className="flex items-center py-4">
         <Input
-          placeholder="Buscar producto por nombre..."
+          placeholder="Buscar producto por nombre o descripción..."
           value={globalFilter}
           onChange={(e) => setGlobalFilter(e.target.value)}
           className="max-w-sm"
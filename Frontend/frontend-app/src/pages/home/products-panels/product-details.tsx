@@ -47,6 +47,7 @@ interface Product {
   tipo_unidad: { id: number; nombre: string } | null
   descripcion: string
   imagen: string | null
+  imagen_variantes?: Record<string, string>
   proveedores: {
     id: number
     nombre: string
@@ -163,11 +164,14 @@ export default function ProductDetails() {
   }
 
   const current = isEditing ? editedProduct : product
-  const imageSrc = previewImage
-    ? previewImage
-    : current.imagen
+  const originalSrc = current.imagen
     ? `http://localhost:8000${current.imagen.startsWith("/") ? current.imagen : "/" + current.imagen}`
     : ""
+  const imageSrc = previewImage
+    ? previewImage
+    : current.imagen_variantes?.large
+    ? `http://localhost:8000${current.imagen_variantes.large}`
+    : originalSrc
 
   return (
     <div className="container mx-auto px-4 py-6 max-w-4xl">
@@ -207,7 +211,15 @@ export default function ProductDetails() {
               <Label>Imagen del Producto</Label>
               <div className="relative group">
                 {imageSrc ? (
-                  <img src={imageSrc} alt={current.nombre} className="max-h-full max-w-full object-contain center mx-auto rounded-lg" />
+                  <img
+                    src={imageSrc}
+                    alt={current.nombre}
+                    className="max-h-full max-w-full object-contain center mx-auto rounded-lg"
+                    // Si la variante aún no existe en disco se muestra el original
+                    onError={(e) => {
+                      if (originalSrc && e.currentTarget.src !== originalSrc) e.currentTarget.src = originalSrc
+                    }}
+                  />
                 ) : (
                   <div className="w-full h-64 bg-gray-200 rounded-lg flex items-center justify-center text-gray-500">
                     Sin imagen
@@ -51,6 +51,8 @@ export default function SalesView() {
   const [productos, setProductos] = useState<ProductoBackend[]>([])
   const [loadingProductos, setLoadingProductos] = useState(true)
   const [clientes, setClientes] = useState<Cliente[]>([])
+  const [busquedaCliente, setBusquedaCliente] = useState("")
+  const [clienteSeleccionadoData, setClienteSeleccionadoData] = useState<Cliente | null>(null)
   const [loadingVenta, setLoadingVenta] = useState(false)
   const [numeroOrden, setNumeroOrden] = useState<string | null>(null);
   
@@ -115,7 +117,8 @@ useEffect(() => {
           };
         })
         .filter((p): p is { nombre: string; cantidad: number; precio: number } => p !== null),
-      numeroOrden: numeroOrden,
+      // El número real lo asigna el servidor al registrar; la vista previa es solo una estimación
+      numeroOrden: res.data.orden_venta,
     });
 
     await fetchProductos();
@@ -174,17 +177,21 @@ useEffect(() => {
     fetchProductos()
   }, [])
 
+  // Sugerencias por prefijo de DNI/RUC o nombre; no se descarga la lista completa
   useEffect(() => {
-    const fetchClientes = async () => {
+    if (!openCombobox) return
+    const timeout = setTimeout(async () => {
       try {
-        const res = await axios.get("http://localhost:8000/clientes/")
+        const res = await axios.get("http://localhost:8000/clientes/sugerencias", {
+          params: { q: busquedaCliente, limit: 20 },
+        })
         setClientes(res.data)
       } catch (err) {
         console.error("Error al cargar clientes:", err)
       }
-    }
-    fetchClientes()
-  }, [])
+    }, 150)
+    return () => clearTimeout(timeout)
+  }, [busquedaCliente, openCombobox])
 
   const agregarProducto = (producto: ProductoBackend) => {
     setProductosVenta((prev) => {
@@ -236,8 +243,6 @@ useEffect(() => {
       producto.tipo_unidad?.nombre?.toLowerCase().includes(busquedaProducto.toLowerCase())
   )
 
-  const clienteSeleccionadoData = clientes.find((c) => c.id.toString() === clienteSeleccionado)
-
   
   useEffect(() => {
     if (clienteSeleccionadoData?.documento) {
@@ -256,7 +261,9 @@ useEffect(() => {
 
   
   const handleSeleccionarCliente = (currentValue: string) => {
-    setClienteSeleccionado(currentValue === clienteSeleccionado ? "" : currentValue);
+    const deseleccionar = currentValue === clienteSeleccionado
+    setClienteSeleccionado(deseleccionar ? "" : currentValue);
+    setClienteSeleccionadoData(deseleccionar ? null : clientes.find((c) => c.id.toString() === currentValue) ?? null);
     setVentaParaPDF(null); 
     setOpenCombobox(false);
   };
@@ -298,10 +305,8 @@ useEffect(() => {
                     aria-expanded={openCombobox}
                     className="w-full justify-between bg-transparent"
                   >
-                    {clienteSeleccionado
-                    ? clientes.find((cliente) => cliente.id.toString() === clienteSeleccionado)?.nombre + 
-                      " - " + 
-                      clientes.find((cliente) => cliente.id.toString() === clienteSeleccionado)?.documento
+                    {clienteSeleccionadoData
+                    ? clienteSeleccionadoData.nombre + " - " + clienteSeleccionadoData.documento
                     : "Seleccionar cliente..."}
 
                     <ChevronsUpDown className="ml-2 h-4 w-4 shrink-0 opacity-50" />
@@ -309,9 +314,11 @@ useEffect(() => {
                   </Button>
                 </PopoverTrigger>
                 <PopoverContent className="w-[500px] max-h-[400px] overflow-y-auto p-0">
-              <Command>
+              <Command shouldFilter={false}>
                 <CommandInput
-                  placeholder="Buscar cliente..."
+                  placeholder="Buscar por DNI/RUC o nombre..."
+                  value={busquedaCliente}
+                  onValueChange={setBusquedaCliente}
                   className="h-10 text-base px-3"
                 />
                 <CommandList className="max-h-[300px] overflow-y-auto">
@@ -471,7 +478,13 @@ useEffect(() => {
                     
               <div className="text-center border-b pb-4">
                 <h2 className="text-lg font-bold">ORDEN DE VENTA</h2>
-                <p className="text-sm text-gray-600">#{numeroOrden || "Cargando..."}</p>
+                <p className="text-sm text-gray-600">
+                  {ventaParaPDF?.numeroOrden
+                    ? `#${ventaParaPDF.numeroOrden}`
+                    : numeroOrden
+                    ? `#${numeroOrden} (estimado)`
+                    : "Cargando..."}
+                </p>
                 <p className="text-xs text-gray-500">{new Date().toLocaleDateString()}</p>
               </div>
               <div className="space-y-2">
@@ -556,6 +569,7 @@ useEffect(() => {
                   onClick={() => {
                     setProductosVenta([]);
                     setClienteSeleccionado("");
+                    setClienteSeleccionadoData(null);
                     setVentaParaPDF(null);
                   }}
                 >
@@ -46,51 +46,87 @@ export default function SalesHistory() {
   const navigate = useNavigate()
   const [ventas, setVentas] = useState<Venta[]>([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [currentPage, setCurrentPage] = useState(1)
   const [searchTerm, setSearchTerm] = useState("")
   const [clienteFilter, setClienteFilter] = useState("all")
+  const [orden, setOrden] = useState("")
+  const [clientes, setClientes] = useState<{ id: number; nombre: string }[]>([])
 
   const itemsPerPage = 15
+  const pageSize = 100
 
   const handleViewVenta = (ventaId: number) => {
     navigate(`/home/sales-record-panels/view-sales/${ventaId}`)
   }
 
+  // Opciones del filtro: todos los clientes, no solo los de las ventas ya cargadas
   useEffect(() => {
+    axios.get(`${import.meta.env.VITE_API_URL}/clientes/`)
+      .then((response) => setClientes(response.data))
+      .catch((error) => console.error("Error al cargar clientes:", error))
+  }, [])
+
+  // Se espera a que el usuario deje de escribir antes de consultar
+  useEffect(() => {
+    const timeout = setTimeout(() => setOrden(searchTerm.trim().replace(/^#/, "")), 250)
+    return () => clearTimeout(timeout)
+  }, [searchTerm])
+
+  // Los filtros se aplican en el servidor (SQL) sobre todo el historial
+  const filtros = {
+    limit: pageSize,
+    orden: orden || undefined,
+    cliente_id: clienteFilter === "all" ? undefined : clienteFilter,
+  }
+
+  // Al cambiar un filtro se vuelve a la primera página y se descarta el cursor
+  useEffect(() => {
+    let cancelado = false
     const fetchVentas = async () => {
       try {
-        setLoading(true)
-        const response = await axios.get(`${import.meta.env.VITE_API_URL}/ventas/`)
-        setVentas(response.data)
+        const response = await axios.get(`${import.meta.env.VITE_API_URL}/ventas/`, { params: filtros })
+        if (cancelado) return
+        setVentas(response.data.items)
+        setNextCursor(response.data.next_cursor)
+        setCurrentPage(1)
       } catch (error) {
+        if (cancelado) return
         console.error("Error al cargar ventas:", error)
         setVentas([])
+        setNextCursor(null)
       } finally {
-        setLoading(false)
+        if (!cancelado) setLoading(false)
       }
     }
 
     fetchVentas()
-  }, [])
-
-  
-  const filteredData = ventas.filter((venta) => {
-    const matchesSearch =
-      venta.cliente.nombre.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      venta.orden_venta.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      venta.detalles.some(detalle => 
-        detalle.producto.nombre.toLowerCase().includes(searchTerm.toLowerCase())
-      )
-    const matchesCliente = clienteFilter === "all" || 
-      venta.cliente.nombre === clienteFilter
-    return matchesSearch && matchesCliente
-  })
+    return () => {
+      cancelado = true
+    }
+  }, [orden, clienteFilter])
+
+  const loadMore = async () => {
+    if (!nextCursor) return
+    try {
+      setLoadingMore(true)
+      const response = await axios.get(`${import.meta.env.VITE_API_URL}/ventas/`, {
+        params: { ...filtros, cursor: nextCursor }
+      })
+      setVentas((prev) => [...prev, ...response.data.items])
+      setNextCursor(response.data.next_cursor)
+    } catch (error) {
+      console.error("Error al cargar más ventas:", error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
 
-  
-  const totalPages = Math.ceil(filteredData.length / itemsPerPage)
+  const totalPages = Math.ceil(ventas.length / itemsPerPage)
   const startIndex = (currentPage - 1) * itemsPerPage
   const endIndex = startIndex + itemsPerPage
-  const currentData = filteredData.slice(startIndex, endIndex)
+  const currentData = ventas.slice(startIndex, endIndex)
 
   
   const goToPage = (page: number) => {
@@ -112,17 +148,12 @@ export default function SalesHistory() {
   
   const handleSearchChange = (value: string) => {
     setSearchTerm(value)
-    setCurrentPage(1)
   }
 
   const handleClienteChange = (value: string) => {
     setClienteFilter(value)
-    setCurrentPage(1)
   }
 
-  
-  const clientesUnicos = [...new Set(ventas.map(venta => venta.cliente.nombre))]
-
   const formatCurrency = (amount: number) => {
     return new Intl.NumberFormat('es-PE', {
       style: 'currency',
@@ -214,7 +245,7 @@ export default function SalesHistory() {
         <CardHeader>
           <CardTitle>Ventas Registradas</CardTitle>
           <CardDescription>
-            Mostrando {startIndex + 1}-{Math.min(endIndex, filteredData.length)} de {filteredData.length} ventas
+            Mostrando {startIndex + 1}-{Math.min(endIndex, ventas.length)} de {ventas.length}{nextCursor ? "+" : ""} ventas
           </CardDescription>
         </CardHeader>
         <CardContent>
@@ -223,7 +254,7 @@ export default function SalesHistory() {
             <div className="relative flex-1">
               <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 text-muted-foreground h-4 w-4" />
               <Input
-                placeholder="Buscar por cliente, orden o producto..."
+                placeholder="Buscar por número de orden..."
                 value={searchTerm}
                 onChange={(e) => handleSearchChange(e.target.value)}
                 className="pl-10"
@@ -236,9 +267,9 @@ export default function SalesHistory() {
               </SelectTrigger>
               <SelectContent>
                 <SelectItem value="all">Todos los clientes</SelectItem>
-                {clientesUnicos.map((cliente) => (
-                  <SelectItem key={cliente} value={cliente}>
-                    {cliente}
+                {clientes.map((cliente) => (
+                  <SelectItem key={cliente.id} value={String(cliente.id)}>
+                    {cliente.nombre}
                   </SelectItem>
                 ))}
               </SelectContent>
@@ -306,7 +337,7 @@ export default function SalesHistory() {
                 ) : (
                   <TableRow>
                     <TableCell colSpan={8} className="text-center py-8 text-muted-foreground">
-                      {ventas.length === 0 ? "No hay ventas registradas" : "No se encontraron ventas que coincidan con los filtros"}
+                      {orden || clienteFilter !== "all" ? "No se encontraron ventas que coincidan con los filtros" : "No hay ventas registradas"}
                     </TableCell>
                   </TableRow>
                 )}
@@ -374,6 +405,14 @@ export default function SalesHistory() {
               </div>
             </div>
           )}
+
+          {nextCursor && (
+            <div className="flex justify-center mt-4">
+              <Button variant="outline" size="sm" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? "Cargando..." : "Cargar más"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>
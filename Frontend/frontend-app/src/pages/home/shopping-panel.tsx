@@ -220,7 +220,9 @@ const handleGuardarCompra = async () => {
       })),
     };
 
-    await axios.post(`${import.meta.env.VITE_API_URL}/compras/`, compraPayload);
+    const res = await axios.post(`${import.meta.env.VITE_API_URL}/compras/`, compraPayload);
+    // El PDF usa el número asignado por el servidor, no la estimación de la vista previa
+    setNumeroOrden(res.data.orden_compra);
     setCompraGuardada(true);
   } catch (error) {
     console.error("Error al guardar la compra", error);
@@ -485,7 +487,9 @@ const handleGuardarCompra = async () => {
                       {/* Encabezado del documento */}
                       <div className="text-center border-b pb-4">
                         <h2 className="text-lg font-bold">ORDEN DE COMPRA</h2>
-                        <p className="text-sm text-gray-600">#{numeroOrden || "Cargando..."}</p>
+                        <p className="text-sm text-gray-600">
+                          {numeroOrden ? `#${numeroOrden}${compraGuardada ? "" : " (estimado)"}` : "Cargando..."}
+                        </p>
 
                         <p className="text-xs text-gray-500">{new Date().toLocaleDateString()}</p>
                       </div>
@@ -41,50 +41,87 @@ export default function ShoppingHistory() {
   const navigate = useNavigate()
   const [compras, setCompras] = useState<Compra[]>([])
   const [loading, setLoading] = useState(true)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const [currentPage, setCurrentPage] = useState(1)
   const [searchTerm, setSearchTerm] = useState("")
   const [proveedorFilter, setProveedorFilter] = useState("all")
+  const [orden, setOrden] = useState("")
+  const [proveedores, setProveedores] = useState<{ id: number; nombre: string }[]>([])
 
   const itemsPerPage = 15
+  const pageSize = 100
 
   const handleViewCompra = (compraId: number) => {
     navigate(`/home/shopping-record-panels/view-shopping/${compraId}`)
   }
 
+  // Opciones del filtro: todos los proveedores, no solo los de las compras ya cargadas
   useEffect(() => {
+    axios.get(`${import.meta.env.VITE_API_URL}/proveedores/`)
+      .then((response) => setProveedores(response.data))
+      .catch((error) => console.error("Error al cargar proveedores:", error))
+  }, [])
+
+  // Se espera a que el usuario deje de escribir antes de consultar
+  useEffect(() => {
+    const timeout = setTimeout(() => setOrden(searchTerm.trim().replace(/^#/, "")), 250)
+    return () => clearTimeout(timeout)
+  }, [searchTerm])
+
+  // Los filtros se aplican en el servidor (SQL) sobre todo el historial
+  const filtros = {
+    limit: pageSize,
+    orden: orden || undefined,
+    proveedor_id: proveedorFilter === "all" ? undefined : proveedorFilter,
+  }
+
+  // Al cambiar un filtro se vuelve a la primera página y se descarta el cursor
+  useEffect(() => {
+    let cancelado = false
     const fetchCompras = async () => {
       try {
-        setLoading(true)
-        const response = await axios.get(`${import.meta.env.VITE_API_URL}/compras/`)
-        setCompras(response.data)
+        const response = await axios.get(`${import.meta.env.VITE_API_URL}/compras/`, { params: filtros })
+        if (cancelado) return
+        setCompras(response.data.items)
+        setNextCursor(response.data.next_cursor)
+        setCurrentPage(1)
       } catch (error) {
+        if (cancelado) return
         console.error("Error al cargar compras:", error)
         setCompras([])
+        setNextCursor(null)
       } finally {
-        setLoading(false)
+        if (!cancelado) setLoading(false)
       }
     }
 
     fetchCompras()
-  }, [])
-
-   const filteredData = compras.filter((compra) => {
-    const matchesSearch =
-      compra.proveedor.nombre.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      compra.orden_compra.toLowerCase().includes(searchTerm.toLowerCase()) ||
-      compra.detalles.some(detalle => 
-        detalle.producto.nombre.toLowerCase().includes(searchTerm.toLowerCase())
-      )
-    const matchesProveedor = proveedorFilter === "all" || 
-      compra.proveedor.nombre === proveedorFilter
-    return matchesSearch && matchesProveedor
-  })
+    return () => {
+      cancelado = true
+    }
+  }, [orden, proveedorFilter])
+
+  const loadMore = async () => {
+    if (!nextCursor) return
+    try {
+      setLoadingMore(true)
+      const response = await axios.get(`${import.meta.env.VITE_API_URL}/compras/`, {
+        params: { ...filtros, cursor: nextCursor }
+      })
+      setCompras((prev) => [...prev, ...response.data.items])
+      setNextCursor(response.data.next_cursor)
+    } catch (error) {
+      console.error("Error al cargar más compras:", error)
+    } finally {
+      setLoadingMore(false)
+    }
+  }
 
-  
-  const totalPages = Math.ceil(filteredData.length / itemsPerPage)
+  const totalPages = Math.ceil(compras.length / itemsPerPage)
   const startIndex = (currentPage - 1) * itemsPerPage
   const endIndex = startIndex + itemsPerPage
-  const currentData = filteredData.slice(startIndex, endIndex)
+  const currentData = compras.slice(startIndex, endIndex)
 
   
   const goToPage = (page: number) => {
@@ -106,17 +143,12 @@ export default function ShoppingHistory() {
   
   const handleSearchChange = (value: string) => {
     setSearchTerm(value)
-    setCurrentPage(1)
   }
 
   const handleProveedorChange = (value: string) => {
     setProveedorFilter(value)
-    setCurrentPage(1)
   }
 
-  
-  const proveedoresUnicos = [...new Set(compras.map(compra => compra.proveedor.nombre))]
-
   const formatCurrency = (amount: number) => {
     return new Intl.NumberFormat('es-PE', {
       style: 'currency',
@@ -206,7 +238,7 @@ export default function ShoppingHistory() {
         <CardHeader>
           <CardTitle>Compras Registradas</CardTitle>
           <CardDescription>
-            Mostrando {startIndex + 1}-{Math.min(endIndex, filteredData.length)} de {filteredData.length} compras
+            Mostrando {startIndex + 1}-{Math.min(endIndex, compras.length)} de {compras.length}{nextCursor ? "+" : ""} compras
           </CardDescription>
         </CardHeader>
         <CardContent>
@@ -215,7 +247,7 @@ export default function ShoppingHistory() {
             <div className="relative flex-1">
               <Search className="absolute left-3 top-1/2 transform -translate-y-1/2 text-muted-foreground h-4 w-4" />
               <Input
-                placeholder="Buscar por proveedor, orden o producto..."
+                placeholder="Buscar por número de orden..."
                 value={searchTerm}
                 onChange={(e) => handleSearchChange(e.target.value)}
                 className="pl-10"
@@ -228,9 +260,9 @@ export default function ShoppingHistory() {
               </SelectTrigger>
               <SelectContent>
                 <SelectItem value="all">Todos los proveedores</SelectItem>
-                {proveedoresUnicos.map((proveedor) => (
-                  <SelectItem key={proveedor} value={proveedor}>
-                    {proveedor}
+                {proveedores.map((proveedor) => (
+                  <SelectItem key={proveedor.id} value={String(proveedor.id)}>
+                    {proveedor.nombre}
                   </SelectItem>
                 ))}
               </SelectContent>
@@ -296,7 +328,7 @@ export default function ShoppingHistory() {
                 ) : (
                   <TableRow>
                     <TableCell colSpan={8} className="text-center py-8 text-muted-foreground">
-                      {compras.length === 0 ? "No hay compras registradas" : "No se encontraron compras que coincidan con los filtros"}
+                      {orden || proveedorFilter !== "all" ? "No se encontraron compras que coincidan con los filtros" : "No hay compras registradas"}
                     </TableCell>
                   </TableRow>
                 )}
@@ -364,6 +396,14 @@ export default function ShoppingHistory() {
               </div>
             </div>
           )}
+
+          {nextCursor && (
+            <div className="flex justify-center mt-4">
+              <Button variant="outline" size="sm" onClick={loadMore} disabled={loadingMore}>
+                {loadingMore ? "Cargando..." : "Cargar más"}
+              </Button>
+            </div>
+          )}
         </CardContent>
       </Card>
     </div>